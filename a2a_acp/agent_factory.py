@@ -0,0 +1,94 @@
+"""
+Per-process agent factory for the ACP servers.
+
+Agents keep per-run state (memory, task outputs), so each request still gets
+its own agent or crew. Everything else - tools, parsed prompt templates, agent
+settings - is immutable and only needs building once per process:
+
+    factory = AgentFactory("health_agent")
+
+    def new_agent():
+        tools = factory.shared("tools", lambda: [DuckDuckGoSearchTool(), VisitWebpageTool()])
+        return CodeAgent(tools=tools, model=model)
+
+    agent = factory.build(new_agent)
+
+Only share parts that are reused as they are: a part that has to be copied per
+run (e.g. a CrewAI crew, whose copy() rebuilds it) saves little or nothing.
+`stats()` reports how long the shared parts took to build, how often they were
+reused, the construction time that reuse saved and the per-run build time;
+readiness.start_readiness_server can serve them while the agent runs, and the
+totals are printed when the process exits.
+"""
+import atexit
+import importlib.resources
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+class AgentFactory:
+    """Caches the immutable parts of an agent and times the per-run construction"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        # key -> (value, seconds it took to build)
+        self._parts: Dict[Hashable, Tuple[Any, float]] = {}
+        self.hits = 0
+        self.saved_seconds = 0.0
+        self.runs = 0
+        self.run_build_seconds = 0.0
+        atexit.register(self.log_stats)
+
+    def shared(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Return the part cached under key, building it on first use"""
+        with self._lock:
+            entry = self._parts.get(key)
+            if entry is not None:
+                self.hits += 1
+                self.saved_seconds += entry[1]
+                return entry[0]
+
+        start = time.perf_counter()
+        value = build()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            # Two first requests may race; keep whichever finished first
+            entry = self._parts.setdefault(key, (value, elapsed))
+        return entry[0]
+
+    def build(self, build: Callable[..., Any], *args: Any) -> Any:
+        """Create the per-run agent state with build(*args)"""
+        start = time.perf_counter()
+        value = build(*args)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.runs += 1
+            self.run_build_seconds += elapsed
+        logger.debug("%s: built run state in %.1fms", self.name, elapsed * 1000)
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "shared_parts": len(self._parts),
+                "shared_build_ms": round(sum(seconds for _, seconds in self._parts.values()) * 1000, 2),
+                "shared_hits": self.hits,
+                "saved_ms": round(self.saved_seconds * 1000, 2),
+                "avg_run_build_ms": round(self.run_build_seconds / self.runs * 1000, 2) if self.runs else None
+            }
+
+    def log_stats(self):
+        stats = self.stats()
+        if stats["runs"]:
+            print(f"📊 {self.name} agent factory: {stats}")
+
+def load_prompt_templates(name: str) -> dict:
+    """Parse one of smolagents' bundled prompt files (e.g. "code_agent.yaml")"""
+    return yaml.safe_load(importlib.resources.files("smolagents.prompts").joinpath(name).read_text())
@@ -0,0 +1,215 @@
+"""
+Bounded worker pool for running synchronous agent frameworks from ACP agents.
+
+smolagents' `agent.run()` is blocking; calling it straight from an `async def`
+ACP agent stalls the server's event loop, so only one run makes progress at a
+time. AgentRunner moves each run onto a thread pool instead:
+
+- at most `max_concurrency` runs execute at once
+- up to `max_queue` more wait for a free worker
+- anything beyond that is rejected immediately with AgentOverloadedError
+- a run that exceeds `timeout` seconds raises asyncio.TimeoutError for the caller;
+  the clock starts when a worker picks the run up, not while it is queued
+
+Python can't kill a thread, so a timed-out run keeps its worker until it
+returns; it still counts against the limits until then, which keeps the
+overload check honest.
+
+`stream()` does the same for a generator (e.g. `agent.run(prompt, stream=True)`),
+handing each item to the event loop as soon as the worker produces it, and
+`stream_message_parts()` turns a smolagents event stream into ACP MessageParts;
+overload and timeout fail the ACP run with an error, so clients can tell them
+from an answer.
+
+Defaults come from AGENT_MAX_CONCURRENCY, AGENT_MAX_QUEUE and AGENT_RUN_TIMEOUT.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+from acp_sdk.models import ACPError, Error, MessagePart, TrajectoryMetadata
+
+# Longest tool output echoed into the trajectory stream
+MAX_OBSERVATION_CHARS = 500
+
+class AgentOverloadedError(RuntimeError):
+    """Raised when a run is submitted while the pool and its queue are full"""
+
+class AgentRunner:
+    def __init__(self, name: str, max_concurrency: Optional[int] = None, max_queue: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        self.name = name
+        self.max_concurrency = max_concurrency or int(os.getenv("AGENT_MAX_CONCURRENCY", "4"))
+        self.max_queue = int(os.getenv("AGENT_MAX_QUEUE", "16")) if max_queue is None else max_queue
+        self.timeout = float(os.getenv("AGENT_RUN_TIMEOUT", "300")) if timeout is None else timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix=f"{name}-run")
+        self._lock = threading.Lock()
+        # Runs submitted and not yet finished (running + queued)
+        self._pending = 0
+
+    def _admit(self):
+        with self._lock:
+            if self._pending >= self.max_concurrency + self.max_queue:
+                raise AgentOverloadedError(
+                    f"{self.name} is at capacity ({self.max_concurrency} running, {self.max_queue} queued); please retry shortly"
+                )
+            self._pending += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _call(self, fn: Callable[..., Any], started: Callable[[], None], *args: Any) -> Any:
+        try:
+            started()
+            return fn(*args)
+        finally:
+            # Released from the worker thread, so timed-out runs hold their slot until they finish
+            self._release()
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) on the pool and await its result"""
+        self._admit()
+        loop = asyncio.get_running_loop()
+        started = loop.create_future()
+        try:
+            future = self._executor.submit(self._call, fn, lambda: _signal(loop, started), *args)
+        except BaseException:
+            self._release()
+            raise
+        # A run cancelled while still queued never reaches _call, so release it here
+        future.add_done_callback(lambda f: self._release() if f.cancelled() else None)
+        result = asyncio.wrap_future(future)
+        try:
+            # Queued runs wait for a worker without a deadline; the timeout covers the run itself
+            await asyncio.wait({started, result}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        return await asyncio.wait_for(result, self.timeout)
+
+    async def stream(self, fn: Callable[..., Iterator[Any]], *args: Any) -> AsyncIterator[Any]:
+        """Iterate fn(*args) on the pool, yielding its items as they are produced.
+
+        The timeout covers the whole stream from the moment a worker starts it.
+        If the consumer stops early the generator is closed at its next item,
+        freeing the worker.
+        """
+        self._admit()
+        loop = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+        done = object()
+        started = object()
+        stopped = threading.Event()
+
+        def put(item: Any, error: Optional[BaseException] = None):
+            try:
+                loop.call_soon_threadsafe(items.put_nowait, (item, error))
+            except RuntimeError:
+                # The event loop is gone; nobody is listening any more
+                stopped.set()
+
+        def produce():
+            events = fn(*args)
+            try:
+                for item in events:
+                    if stopped.is_set():
+                        break
+                    put(item)
+            except BaseException as e:
+                put(done, e)
+            else:
+                put(done)
+            finally:
+                close = getattr(events, "close", None)
+                if close is not None:
+                    close()
+
+        try:
+            future = self._executor.submit(self._call, produce, lambda: put(started))
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda f: self._release() if f.cancelled() else None)
+
+        # Set once a worker picks the stream up; waiting in the queue doesn't count
+        deadline = None
+        try:
+            while True:
+                if deadline is None:
+                    item, error = await items.get()
+                else:
+                    item, error = await asyncio.wait_for(items.get(), max(deadline - loop.time(), 0))
+                if item is started:
+                    deadline = loop.time() + self.timeout
+                    continue
+                if item is done:
+                    if error is not None:
+                        raise error
+                    return
+                yield item
+        finally:
+            stopped.set()
+            future.cancel()
+
+    def timeout_message(self) -> str:
+        return f"I'm sorry, {self.name} could not finish this request within {self.timeout:.0f} seconds. Please try again."
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "timeout": self.timeout
+            }
+
+def _signal(loop: asyncio.AbstractEventLoop, future: asyncio.Future):
+    """Resolve future from a worker thread (no-op once its loop has closed)"""
+    try:
+        loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+    except RuntimeError:
+        pass
+
+def _event_part(event: Any) -> Optional[MessagePart]:
+    """Map one smolagents stream event to a MessagePart (None to skip it)"""
+    kind = type(event).__name__
+    if kind == "ChatMessageStreamDelta":
+        # Model tokens as they arrive: thoughts, code and the final answer call
+        if event.content:
+            return MessagePart(metadata=TrajectoryMetadata(message=event.content))
+    elif kind == "ToolCall":
+        # CodeAgent's python_interpreter code was already streamed token by token
+        if event.name not in ("python_interpreter", "final_answer"):
+            return MessagePart(metadata=TrajectoryMetadata(tool_name=event.name, tool_input=event.arguments))
+    elif kind == "ToolOutput":
+        if not event.is_final_answer and event.observation:
+            observation = str(event.observation)[:MAX_OBSERVATION_CHARS]
+            tool_name = event.tool_call.name if event.tool_call else None
+            return MessagePart(metadata=TrajectoryMetadata(tool_name=tool_name, tool_output=observation))
+    elif kind == "ActionStep":
+        if event.error:
+            return MessagePart(metadata=TrajectoryMetadata(message=f"\nStep {event.step_number} failed: {event.error}\n"))
+    elif kind == "FinalAnswerStep":
+        return MessagePart(content=str(event.output))
+    return None
+
+async def stream_message_parts(runner: AgentRunner, fn: Callable[..., Iterator[Any]], *args: Any) -> AsyncIterator[MessagePart]:
+    """Run a smolagents `agent.run(..., stream=True)` generator and yield ACP MessageParts.
+
+    Intermediate tokens, tool calls and observations are sent as trajectory
+    parts (content in metadata only); the final answer is the one part with
+    content. Overload and timeout raise ACPError, which fails the run with an
+    "agent_overloaded" or "agent_timeout" error instead of posing as an answer.
+    """
+    try:
+        async for event in runner.stream(fn, *args):
+            part = _event_part(event)
+            if part is not None:
+                yield part
+    except AgentOverloadedError as e:
+        raise ACPError(Error(code="agent_overloaded", message=str(e))) from e
+    except asyncio.TimeoutError as e:
+        raise ACPError(Error(code="agent_timeout", message=runner.timeout_message())) from e
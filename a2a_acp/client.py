@@ -7,22 +7,48 @@ from colorama import Fore, Style, init
 init()
 nest_asyncio.apply()
 
+async def stream_run(client: Client, agent: str, input: str, color: str) -> str:
+    """Run an agent with the streaming API, printing its steps and answer as they arrive.
+
+    Trajectory parts (model tokens, tool calls, observations) are printed dimmed;
+    parts with content make up the answer, which is returned.
+    """
+    answer = []
+    async for event in client.run_stream(agent=agent, input=input):
+        if event.type == "message.part":
+            part = event.part
+            trajectory = part.metadata
+            if part.content:
+                answer.append(part.content)
+                print(color + part.content + Fore.RESET, end="", flush=True)
+            elif trajectory is not None and getattr(trajectory, "message", None):
+                print(Style.DIM + trajectory.message + Style.RESET_ALL, end="", flush=True)
+            elif trajectory is not None and getattr(trajectory, "tool_name", None):
+                detail = trajectory.tool_output if trajectory.tool_output is not None else trajectory.tool_input
+                print(Style.DIM + f"\n[{trajectory.tool_name}] {detail}\n" + Style.RESET_ALL, end="", flush=True)
+        elif event.type == "message.completed" and not answer:
+            # Agents that yield a whole Message at once
+            answer.extend(part.content for part in event.message.parts if part.content)
+            print(color + "".join(answer) + Fore.RESET, end="")
+        elif event.type == "run.failed":
+            raise RuntimeError(event.run.error)
+        elif event.type == "error":
+            raise RuntimeError(event.error)
+    print()
+    return "".join(answer)
+
 async def run_doctor_workflow() -> None:
     async with Client(base_url="http://localhost:8000") as hospital:
-        run1 = await hospital.run_sync(
-            agent="doctor_agent", input="I'm based in Atlanta,GA. Are there any Cardiologists near me?"
+        await stream_run(
+            hospital, "doctor_agent", "I'm based in Atlanta,GA. Are there any Cardiologists near me?", Fore.LIGHTMAGENTA_EX
         )
-        content = run1.output[0].parts[0].content
-        print(Fore.LIGHTMAGENTA_EX+ content + Fore.RESET)
 
 async def run_hospital_workflow() -> None:
     """ This workflow simulates a hospital agent and policy agent interaction."""
     async with Client(base_url="http://localhost:8001") as insurer, Client(base_url="http://localhost:8000") as hospital:
-        run1 = await hospital.run_sync(
-            agent="health_agent", input="Do I need rehabilitation after a shoulder reconstruction?"
+        content = await stream_run(
+            hospital, "health_agent", "Do I need rehabilitation after a shoulder reconstruction?", Fore.LIGHTMAGENTA_EX
         )
-        content = run1.output[0].parts[0].content
-        print(Fore.LIGHTMAGENTA_EX+ content + Fore.RESET)
 
         run2 = await insurer.run_sync(
             agent="policy_agent", input=f"Context: {content} What is the waiting period for rehabilitation?"
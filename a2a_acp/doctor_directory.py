@@ -0,0 +1,227 @@
+"""
+Cached, indexed doctor directory used by the doctor MCP server (mcpserver.py).
+
+The directory is loaded once and then served from in-memory indexes by state
+and specialty. A URL source is revalidated after DOCTORS_TTL seconds with a
+conditional GET (ETag / If-Modified-Since). Each successful download is
+written to a local snapshot, which is used when the network is unavailable
+or DOCTORS_OFFLINE=1 (and reloaded when the file changes). The snapshot is not
+part of the repository; lookups raise DirectoryUnavailableError while neither
+the source nor a snapshot can be loaded.
+
+Configuration (environment variables):
+    DOCTORS_SOURCE    URL or local path of doctors.json (default: the GitHub copy)
+    DOCTORS_SNAPSHOT  local snapshot path (default: doctors.json next to this file)
+    DOCTORS_TTL       seconds before a URL source is revalidated (default: 3600)
+    DOCTORS_OFFLINE   set to 1 to never touch the network
+
+Run `python doctor_directory.py` to download or refresh the snapshot, e.g.
+before shipping to an air-gapped deployment.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOURCE = "https://raw.githubusercontent.com/nicknochnack/ACPWalkthrough/refs/heads/main/doctors.json"
+DEFAULT_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "doctors.json")
+
+class DirectoryUnavailableError(RuntimeError):
+    """Neither the doctor directory source nor a local snapshot could be loaded"""
+
+def _is_url(source: str) -> bool:
+    return source.startswith(("http://", "https://"))
+
+def _write_atomic(path: str, content: bytes):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".doctors-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+class DoctorDirectory:
+    """In-memory doctor directory with state/specialty indexes and TTL revalidation"""
+
+    def __init__(self, source: Optional[str] = None, snapshot_path: Optional[str] = None,
+                 ttl: Optional[float] = None, offline: Optional[bool] = None):
+        self.source = source or os.getenv("DOCTORS_SOURCE", DEFAULT_SOURCE)
+        self.snapshot_path = snapshot_path or os.getenv("DOCTORS_SNAPSHOT", DEFAULT_SNAPSHOT)
+        self.ttl = float(os.getenv("DOCTORS_TTL", "3600")) if ttl is None else ttl
+        self.offline = os.getenv("DOCTORS_OFFLINE", "0") == "1" if offline is None else offline
+
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._source_mtime: Optional[float] = None
+        self._doctors: Dict[str, Dict[str, Any]] = {}
+        # Index values are doctor IDs (keys of the directory), in directory order
+        self._by_state: Dict[str, List[str]] = {}
+        self._by_specialty: Dict[str, List[str]] = {}
+
+    def _build_indexes(self, doctors: Dict[str, Dict[str, Any]]):
+        by_state: Dict[str, List[str]] = {}
+        by_specialty: Dict[str, List[str]] = {}
+        for doctor_id, doctor in doctors.items():
+            state = str((doctor.get("address") or {}).get("state", "")).strip().upper()
+            specialty = str(doctor.get("specialty", "")).strip().lower()
+            by_state.setdefault(state, []).append(doctor_id)
+            by_specialty.setdefault(specialty, []).append(doctor_id)
+        self._doctors = doctors
+        self._by_state = by_state
+        self._by_specialty = by_specialty
+        logger.info("Indexed %d doctors across %d states", len(doctors), len(by_state))
+
+    def _load_file(self, path: str) -> bool:
+        try:
+            mtime = os.path.getmtime(path)
+            if mtime == self._source_mtime and self._doctors:
+                return True
+            with open(path, "r", encoding="utf-8") as json_file:
+                self._build_indexes(json.load(json_file))
+            self._source_mtime = mtime
+            return True
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Could not read doctor directory %s: %s", path, e)
+            return False
+
+    def _fetch_url(self) -> bool:
+        headers = {}
+        if self._doctors and self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._doctors and self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+        try:
+            resp = requests.get(self.source, headers=headers, timeout=10)
+            if resp.status_code == 304:
+                return True
+            resp.raise_for_status()
+            doctors = json.loads(resp.content)
+        except (requests.RequestException, json.JSONDecodeError) as e:
+            logger.warning("Could not fetch doctor directory from %s: %s", self.source, e)
+            return False
+
+        self._build_indexes(doctors)
+        self._etag = resp.headers.get("ETag")
+        self._last_modified = resp.headers.get("Last-Modified")
+        try:
+            _write_atomic(self.snapshot_path, resp.content)
+            # The snapshot now matches what is loaded; don't re-read it as a change
+            self._source_mtime = os.path.getmtime(self.snapshot_path)
+        except OSError as e:
+            logger.warning("Could not write doctor snapshot %s: %s", self.snapshot_path, e)
+        return True
+
+    def refresh(self, force: bool = False):
+        """Reload the directory if the TTL has expired (or always, when forced).
+
+        Local files (a path source, or the snapshot when offline) skip the TTL:
+        they are re-read whenever their mtime changes, which costs one stat.
+        """
+        with self._lock:
+            now = time.monotonic()
+            local = not _is_url(self.source) or self.offline
+            if not force and not local and self._checked_at is not None and now - self._checked_at < self.ttl:
+                return
+            self._checked_at = now
+
+            if not _is_url(self.source):
+                loaded = self._load_file(self.source)
+            elif self.offline:
+                loaded = False
+            else:
+                loaded = self._fetch_url()
+
+            # Offline, or when the source has never loaded, use the local snapshot;
+            # cheap when unchanged, since it is only re-read when its mtime changes
+            if not loaded and (self.offline or not self._doctors):
+                loaded = self._load_file(self.snapshot_path)
+            if not loaded and not self._doctors:
+                # Retry on the next lookup instead of serving an empty directory until the TTL expires
+                self._checked_at = None
+                if os.path.exists(self.snapshot_path):
+                    hint = "check the file"
+                else:
+                    hint = "run `python doctor_directory.py` on a connected machine to create it"
+                raise DirectoryUnavailableError(
+                    f"Doctor directory unavailable: could not load {self.source} or the snapshot "
+                    f"{self.snapshot_path} ({hint})"
+                )
+
+    def update_snapshot(self) -> bool:
+        """Download the source URL now and save it as the offline snapshot"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            return _is_url(self.source) and self._fetch_url()
+
+    def by_state(self, state: str) -> List[Dict[str, Any]]:
+        self.refresh()
+        doctors = self._doctors
+        return [doctors[doctor_id] for doctor_id in self._by_state.get(state.strip().upper(), [])]
+
+    def by_specialty(self, specialty: str) -> List[Dict[str, Any]]:
+        self.refresh()
+        doctors = self._doctors
+        return [doctors[doctor_id] for doctor_id in self._specialty_ids(specialty)]
+
+    def _specialty_ids(self, specialty: str) -> List[str]:
+        """IDs for a specialty, tolerating forms like Cardiologist for Cardiology"""
+        query = specialty.strip().lower()
+        if query in self._by_specialty:
+            return self._by_specialty[query]
+        keys = [key for key in self._by_specialty if key and (query in key or key in query)]
+        if not keys and len(query) >= 6:
+            keys = [key for key in self._by_specialty if key[:6] == query[:6]]
+        ids = set()
+        for key in keys:
+            ids.update(self._by_specialty[key])
+        return [doctor_id for doctor_id in self._doctors if doctor_id in ids]
+
+    def search(self, state: str = "", city: str = "", specialty: str = "") -> List[Tuple[str, Dict[str, Any]]]:
+        """(doctor_id, doctor) pairs matching every given filter, in directory order"""
+        self.refresh()
+        doctors = self._doctors
+        candidates: Optional[List[str]] = None
+        if state:
+            candidates = self._by_state.get(state.strip().upper(), [])
+        if specialty:
+            specialty_ids = self._specialty_ids(specialty)
+            if candidates is None:
+                candidates = specialty_ids
+            else:
+                wanted = set(specialty_ids)
+                candidates = [doctor_id for doctor_id in candidates if doctor_id in wanted]
+        if candidates is None:
+            candidates = list(doctors)
+
+        results = [(doctor_id, doctors[doctor_id]) for doctor_id in candidates]
+        if city:
+            city = city.strip().lower()
+            results = [
+                (doctor_id, doctor) for doctor_id, doctor in results
+                if str((doctor.get("address") or {}).get("city", "")).strip().lower() == city
+            ]
+        return results
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._doctors)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    directory = DoctorDirectory(offline=False)
+    if directory.update_snapshot():
+        print(f"✅ Saved {len(directory)} doctors to {directory.snapshot_path}")
+    else:
+        print(f"❌ Could not download {directory.source} (DOCTORS_SOURCE must be a URL)")
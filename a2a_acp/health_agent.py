@@ -1,10 +1,13 @@
 from collections.abc import AsyncGenerator
-from acp_sdk.models import Message, MessagePart
+from acp_sdk.models import Message
 from acp_sdk.server import Context, RunYield, RunYieldResume, Server
 from smolagents import CodeAgent, DuckDuckGoSearchTool, OpenAIServerModel, VisitWebpageTool
 import logging 
 import os
 from typing import Optional, Dict
+from llm_cache import with_llm_cache
+from agent_runner import AgentRunner, stream_message_parts
+from agent_factory import AgentFactory, load_prompt_templates
 from dotenv import load_dotenv
 
 load_dotenv() 
@@ -41,11 +44,11 @@ class AzureOpenAIServerModel(OpenAIServerModel):
         # if we've reached this point, it means the openai package is available (baseclass check) so go ahead and import it
         import openai
 
-        self.client = openai.AzureOpenAI(
+        self.client = with_llm_cache(openai.AzureOpenAI(
             api_key=api_key,
             api_version=api_version,
             azure_endpoint=azure_endpoint
-        )
+        ))
 
 model = AzureOpenAIServerModel(
     model_id = "gpt-4o-mini",
@@ -54,15 +57,31 @@ model = AzureOpenAIServerModel(
     azure_endpoint=os.environ.get("AZURE_OPENAI_ENDPOINT")
 )
 
+# Bounded by AGENT_MAX_CONCURRENCY / AGENT_MAX_QUEUE / AGENT_RUN_TIMEOUT
+runner = AgentRunner("health_agent")
+
+# Tools and prompt templates are built once per process; each run only gets a fresh CodeAgent
+factory = AgentFactory("health_agent")
+
+def new_health_agent() -> CodeAgent:
+    return CodeAgent(
+        tools=factory.shared("tools", lambda: [DuckDuckGoSearchTool(), VisitWebpageTool()]),
+        model=model,
+        prompt_templates=factory.shared("prompt_templates", lambda: load_prompt_templates("code_agent.yaml")),
+        stream_outputs=True
+    )
+
+def stream_health_agent(prompt: str):
+    agent = factory.build(new_health_agent)
+    yield from agent.run(prompt, stream=True)
+
 @server.agent()
 async def health_agent(input: list[Message], context: Context) -> AsyncGenerator[RunYield, RunYieldResume]:
     "This is a CodeAgent which supports the hospital to handle health based questions for patients. Current or prospective patients can use it to find answers about their health and hospital treatments."
-    agent = CodeAgent(tools=[DuckDuckGoSearchTool(), VisitWebpageTool()], model=model)
-
     prompt = input[0].parts[0].content
-    response = agent.run(prompt)
-
-    yield Message(parts=[MessagePart(content=str(response))])
+    # agent.run blocks, so it runs on the worker pool; its steps and tokens are streamed back as they happen
+    async for part in stream_message_parts(runner, stream_health_agent, prompt):
+        yield part
 
 
 if __name__ == "__main__":
@@ -1,10 +1,16 @@
 from collections.abc import AsyncGenerator
-from acp_sdk.models import Message, MessagePart
+from acp_sdk.models import Message
 from acp_sdk.server import RunYield, RunYieldResume, Server
-from smolagents import CodeAgent, DuckDuckGoSearchTool, OpenAIServerModel, VisitWebpageTool, ToolCallingAgent, ToolCollection
+from smolagents import CodeAgent, DuckDuckGoSearchTool, OpenAIServerModel, VisitWebpageTool, ToolCallingAgent
 from mcp import StdioServerParameters
+import atexit
 import os
+from contextlib import ExitStack
 from typing import Optional, Dict
+from llm_cache import with_llm_cache
+from mcp_pool import MCPPoolExhaustedError, MCPToolPool
+from agent_runner import AgentOverloadedError, AgentRunner, stream_message_parts
+from agent_factory import AgentFactory, load_prompt_templates
 
 server = Server()
 
@@ -38,11 +44,11 @@ class AzureOpenAIServerModel(OpenAIServerModel):
         # if we've reached this point, it means the openai package is available (baseclass check) so go ahead and import it
         import openai
 
-        self.client = openai.AzureOpenAI(
+        self.client = with_llm_cache(openai.AzureOpenAI(
             api_key=api_key,
             api_version=api_version,
             azure_endpoint=azure_endpoint
-        )
+        ))
 
 model = AzureOpenAIServerModel(
     model_id = "gpt-4o-mini",
@@ -57,25 +63,69 @@ server_parameters = StdioServerParameters(
     env=None,
 )
 
+# Warm mcpserver.py sessions shared by doctor_agent runs (spawned on first use
+# or at startup), instead of one `uv run` + handshake per request
+mcp_pool = MCPToolPool(server_parameters, size=int(os.environ.get("DOCTOR_MCP_POOL_SIZE", "2")))
+atexit.register(mcp_pool.close)
+# The runner allows more concurrent runs than there are sessions; a run waits
+# this long for one to come back before it is rejected as overloaded
+MCP_BORROW_TIMEOUT = float(os.environ.get("DOCTOR_MCP_BORROW_TIMEOUT", "30"))
+
+# One bounded pool for both agents' blocking runs (AGENT_MAX_CONCURRENCY /
+# AGENT_MAX_QUEUE / AGENT_RUN_TIMEOUT)
+runner = AgentRunner("hospital_agent")
+
+# Tools and prompt templates are built once per process; each run only gets a fresh agent
+factory = AgentFactory("hospital_agent")
+
+def new_health_agent() -> CodeAgent:
+    return CodeAgent(
+        tools=factory.shared("health_tools", lambda: [DuckDuckGoSearchTool(), VisitWebpageTool()]),
+        model=model,
+        prompt_templates=factory.shared("code_agent_prompts", lambda: load_prompt_templates("code_agent.yaml")),
+        stream_outputs=True
+    )
+
+def new_doctor_agent(tools) -> ToolCallingAgent:
+    # MCP tools belong to the borrowed pool session, so only the prompts are shared
+    return ToolCallingAgent(
+        tools=[*tools],
+        model=model,
+        prompt_templates=factory.shared("toolcalling_agent_prompts", lambda: load_prompt_templates("toolcalling_agent.yaml")),
+        stream_outputs=True
+    )
+
+def stream_health_agent(prompt: str):
+    agent = factory.build(new_health_agent)
+    yield from agent.run(prompt, stream=True)
+
+def stream_doctor_agent(prompt: str):
+    # The session stays borrowed until the stream is exhausted or closed
+    with ExitStack() as borrowed:
+        try:
+            tools = borrowed.enter_context(mcp_pool.tools(timeout=MCP_BORROW_TIMEOUT))
+        except MCPPoolExhaustedError as e:
+            raise AgentOverloadedError(
+                f"doctor_agent: all {mcp_pool.size} MCP sessions stayed busy for {MCP_BORROW_TIMEOUT:.0f}s; please retry shortly"
+            ) from e
+        agent = factory.build(new_doctor_agent, tools)
+        yield from agent.run(prompt, stream=True)
+
 @server.agent()
 async def health_agent(input: list[Message]) -> AsyncGenerator[RunYield, RunYieldResume]:
     "This is a CodeAgent which supports the hospital to handle health based questions for patients. Current or prospective patients can use it to find answers about their health and hospital treatments."
-    agent = CodeAgent(tools=[DuckDuckGoSearchTool(), VisitWebpageTool()], model=model)
-
     prompt = input[0].parts[0].content
-    response = agent.run(prompt)
-
-    yield Message(parts=[MessagePart(content=str(response))])
+    # agent.run blocks, so it runs on the worker pool; its steps and tokens are streamed back as they happen
+    async for part in stream_message_parts(runner, stream_health_agent, prompt):
+        yield part
 
 @server.agent()
 async def doctor_agent(input: list[Message]) -> AsyncGenerator[RunYield, RunYieldResume]:
     "This is a Doctor Agent which helps users find doctors near them."
-    with ToolCollection.from_mcp(server_parameters, trust_remote_code=True) as tool_collection:
-        agent = ToolCallingAgent(tools=[*tool_collection.tools], model=model)
-        prompt = input[0].parts[0].content
-        response = agent.run(prompt)
-
-    yield Message(parts=[MessagePart(content=str(response))])
+    prompt = input[0].parts[0].content
+    async for part in stream_message_parts(runner, stream_doctor_agent, prompt):
+        yield part
 
 if __name__ == "__main__":
+    mcp_pool.start()
     server.run(port=8000)
\ No newline at end of file
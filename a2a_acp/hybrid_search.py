@@ -0,0 +1,161 @@
+"""
+Hybrid keyword + vector retrieval over the policy index.
+
+Embedding search alone needs an embedding call per query and tends to miss
+exact clause lookups ("waiting period", "12 months"). HybridRetriever adds a
+local BM25 inverted index over the same chunks (loaded from the Chroma
+collection) and:
+
+1. runs BM25 first; when the best keyword hit contains every query term the
+   vector search is skipped entirely (no embedding call)
+2. otherwise fuses the BM25 and vector rankings with reciprocal rank fusion
+3. re-ranks the fused candidates with a cheap heuristic: query term coverage,
+   exact phrase matches and matching numbers
+
+The keyword index is rebuilt when the collection's contents change (a hash of
+its chunk IDs, which are derived from the chunk text), checked at most every
+`refresh_interval` seconds, so documents added, replaced or removed by
+ingest_policies.py are picked up without a restart.
+"""
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it my of on or that the this to was what when "
+    "where which who will with you your me we our there their any after before".split()
+)
+RRF_K = 60
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+class BM25Index:
+    """In-memory BM25 (Okapi) inverted index over a fixed set of documents"""
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.lengths: List[int] = []
+        for doc_index, text in enumerate(documents):
+            counts = Counter(tokenize(text))
+            self.lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, []).append((doc_index, tf))
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.lengths) - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """(document index, score) pairs for the k best matches, best first"""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_index, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_index] / (self.avg_length or 1))
+                scores[doc_index] = scores.get(doc_index, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = RRF_K) -> Dict[str, float]:
+    """Fuse ranked ID lists: each list contributes 1 / (k + rank) per ID"""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking, start=1):
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (k + rank)
+    return fused
+
+def heuristic_score(query: str, text: str) -> float:
+    """0..1 bonus for chunks that contain the query's terms, phrases and numbers verbatim"""
+    query_terms = set(tokenize(query))
+    if not query_terms:
+        return 0.0
+    chunk_tokens = tokenize(text)
+    chunk_terms = set(chunk_tokens)
+    coverage = len(query_terms & chunk_terms) / len(query_terms)
+
+    ordered = tokenize(query)
+    bigrams = set(zip(ordered, ordered[1:]))
+    phrase = len(bigrams & set(zip(chunk_tokens, chunk_tokens[1:]))) / len(bigrams) if bigrams else 0.0
+
+    numbers = {term for term in query_terms if term[0].isdigit()}
+    number_match = len(numbers & chunk_terms) / len(numbers) if numbers else 0.0
+    return 0.6 * coverage + 0.3 * phrase + 0.1 * number_match
+
+class HybridRetriever:
+    """BM25 + vector retrieval over a PolicyIndex, with keyword-only short-circuit and re-ranking"""
+
+    def __init__(self, index: Any, candidates: int = 20, rerank_weight: float = 0.5, refresh_interval: float = 30.0):
+        self.index = index
+        self.candidates = candidates
+        self.rerank_weight = rerank_weight
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._bm25: Optional[BM25Index] = None
+        self._chunks: List[Dict[str, Any]] = []
+        self._loaded_signature: Optional[str] = None
+        self._checked_at = 0.0
+        self.stats = Counter()
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._bm25 is not None and now - self._checked_at < self.refresh_interval:
+            return
+        with self._lock:
+            if self._bm25 is not None and now - self._checked_at < self.refresh_interval:
+                return
+            self._checked_at = now
+            signature = self.index.signature()
+            if signature == self._loaded_signature:
+                return
+            everything = self.index.collection.get(include=["documents", "metadatas"])
+            chunks = [
+                {"id": chunk_id, "text": text, "source": metadata.get("source"), "page": metadata.get("page")}
+                for chunk_id, text, metadata in zip(everything["ids"], everything["documents"], everything["metadatas"])
+            ]
+            # Swap in whole so concurrent searches never see a half-built index
+            self._bm25, self._chunks, self._loaded_signature = BM25Index([c["text"] for c in chunks]), chunks, signature
+
+    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        self._refresh()
+        bm25, chunks = self._bm25, self._chunks
+        keyword_hits = [chunks[doc_index] for doc_index, _ in bm25.search(query, self.candidates)]
+
+        query_terms = set(tokenize(query))
+        if keyword_hits and query_terms and query_terms <= set(tokenize(keyword_hits[0]["text"])):
+            # The best keyword hit already contains every query term: answer without an embedding call
+            self.stats["keyword_only"] += 1
+            return self._rerank(query, {hit["id"]: hit for hit in keyword_hits}, [[hit["id"] for hit in keyword_hits]], k, "keyword")
+
+        self.stats["hybrid"] += 1
+        vector_hits = self.index.search(query, self.candidates)
+        candidates = {hit["id"]: hit for hit in keyword_hits}
+        for hit in vector_hits:
+            candidates.setdefault(hit["id"], hit)
+        rankings = [[hit["id"] for hit in keyword_hits], [hit["id"] for hit in vector_hits]]
+        return self._rerank(query, candidates, rankings, k, "hybrid")
+
+    def _rerank(self, query: str, candidates: Dict[str, Dict[str, Any]], rankings: List[List[str]], k: int,
+                retrieval: str) -> List[Dict[str, Any]]:
+        fused = reciprocal_rank_fusion(rankings)
+        best = max(fused.values(), default=1.0)
+        results = []
+        for chunk_id, score in fused.items():
+            chunk = candidates[chunk_id]
+            # Normalized fusion score plus the heuristic bonus
+            final = score / best + self.rerank_weight * heuristic_score(query, chunk["text"])
+            results.append({
+                "id": chunk_id, "text": chunk["text"], "source": chunk.get("source"), "page": chunk.get("page"),
+                "score": round(final, 4), "retrieval": retrieval
+            })
+        results.sort(key=lambda result: result["score"], reverse=True)
+        return results[:k]
@@ -0,0 +1,225 @@
+"""
+Offline ingestion of a directory of policy PDFs into the policy_agent index.
+
+    python ingest_policies.py ./policies --workers 8 --batch-size 256 --concurrency 4
+
+PDFs are hashed, parsed and chunked in a process pool (unchanged documents are
+hashed but not parsed). Chunks that aren't already in the index are embedded in
+batches of --batch-size texts, with at most --concurrency embedding requests
+in flight. A document is written to the Chroma store (the same one rag_agent.py
+serves from, POLICY_INDEX_PATH) once all of its chunks are embedded.
+
+A failed embedding request (rate limit, timeout) is retried with exponential
+backoff up to --retries times; if it still fails, the documents in that batch
+are reported as failed and the run carries on with the rest.
+
+Sources are stored as paths relative to the directory, so ingesting the
+a2a_acp folder itself keeps the "gold_hospital.pdf" entry rag_agent.py uses.
+"""
+import argparse
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from dotenv import load_dotenv
+
+from policy_index import PolicyIndex, chunk_pdf, file_hash
+
+logger = logging.getLogger(__name__)
+
+def find_pdfs(root: str) -> Iterator[str]:
+    for directory, _, files in os.walk(root):
+        for name in sorted(files):
+            if name.lower().endswith(".pdf"):
+                yield os.path.join(directory, name)
+
+def parse_document(path: str, source: str, indexed_hashes: Set[str], chunk_size: int, chunk_overlap: int) -> Dict[str, Any]:
+    """Runs in a worker process: hash the PDF and chunk it unless the index already has this version"""
+    doc_hash = file_hash(path)
+    if indexed_hashes == {doc_hash}:
+        return {"source": source, "doc_hash": doc_hash, "records": None}
+    return {"source": source, "doc_hash": doc_hash, "records": chunk_pdf(path, source, chunk_size, chunk_overlap)}
+
+class BatchIngester:
+    """Feeds parsed documents through batched, bounded-concurrency embedding into the index"""
+
+    def __init__(self, index: PolicyIndex, indexed: Dict[str, Dict[str, Set[str]]], batch_size: int, concurrency: int,
+                 retries: int = 4, backoff: float = 1.0, max_backoff: float = 30.0):
+        self.index = index
+        self.indexed = indexed
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._embedders = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="embed")
+        self._in_flight: Dict[Future, List[tuple]] = {}
+        # Chunks waiting for a batch to fill: (source, chunk_id, text)
+        self._buffer: List[tuple] = []
+        # source -> {"doc": parsed document, "vectors": {chunk_id: vector}, "missing": count}
+        self._waiting: Dict[str, Dict[str, Any]] = {}
+        self.totals = {"documents": 0, "unchanged": 0, "written": 0, "added": 0, "removed": 0, "kept": 0,
+                       "embed_calls": 0, "failed": []}
+        self._calls_lock = threading.Lock()
+
+    def add(self, doc: Dict[str, Any]):
+        self.totals["documents"] += 1
+        if doc["records"] is None:
+            self.totals["unchanged"] += 1
+            return
+
+        present = self.indexed.get(doc["source"], {}).get("ids", set())
+        pending = {record["id"]: record["text"] for record in doc["records"] if record["id"] not in present}
+        if not pending:
+            self._write(doc, {})
+            return
+        self._waiting[doc["source"]] = {"doc": doc, "vectors": {}, "missing": len(pending)}
+        for chunk_id, text in pending.items():
+            self._buffer.append((doc["source"], chunk_id, text))
+            if len(self._buffer) >= self.batch_size:
+                self._submit()
+
+    def fail(self, source: str, reason: Exception):
+        logger.warning("Could not ingest %s: %s", source, reason)
+        self.totals["failed"].append(source)
+
+    def _submit(self):
+        batch, self._buffer = self._buffer[:self.batch_size], self._buffer[self.batch_size:]
+        # Bounded concurrency: wait for a slot before sending another request
+        while len(self._in_flight) >= self.concurrency:
+            self._collect(FIRST_COMPLETED)
+        # Chunks of documents that failed while this batch was filling aren't worth embedding
+        batch = [item for item in batch if item[0] in self._waiting]
+        if not batch:
+            return
+        future = self._embedders.submit(self._embed, [text for _, _, text in batch])
+        self._in_flight[future] = batch
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        """Runs on an embedder thread: one embedding request, retried with capped exponential backoff"""
+        for attempt in range(self.retries + 1):
+            with self._calls_lock:
+                self.totals["embed_calls"] += 1
+            try:
+                return self.index.embed(texts)
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                # Jitter keeps concurrent batches from retrying in lockstep after a shared 429
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+                logger.info("Embedding request failed (%s), retrying in %.1fs", e, delay)
+                time.sleep(delay)
+
+    def _collect(self, return_when: str):
+        done, _ = wait(list(self._in_flight), return_when=return_when)
+        for future in done:
+            batch = self._in_flight.pop(future)
+            try:
+                vectors = future.result()
+            except Exception as e:
+                # Give up on every document in the batch; their other chunks are dropped as they come back
+                for source in dict.fromkeys(source for source, _, _ in batch):
+                    if self._waiting.pop(source, None) is not None:
+                        self.fail(source, e)
+                continue
+            for (source, chunk_id, _), vector in zip(batch, vectors):
+                entry = self._waiting.get(source)
+                if entry is None:
+                    continue
+                entry["vectors"][chunk_id] = vector
+                entry["missing"] -= 1
+                if entry["missing"] == 0:
+                    del self._waiting[source]
+                    self._write(entry["doc"], entry["vectors"])
+
+    def _write(self, doc: Dict[str, Any], vectors: Dict[str, List[float]]):
+        try:
+            counts = self.index.write_document(doc["source"], doc["doc_hash"], doc["records"], embeddings=vectors)
+        except Exception as e:
+            self.fail(doc["source"], e)
+            return
+        self.totals["written"] += 1
+        for key in ("added", "removed", "kept"):
+            self.totals[key] += counts[key]
+
+    def finish(self):
+        while self._buffer:
+            self._submit()
+        if self._in_flight:
+            self._collect(ALL_COMPLETED)
+        self._embedders.shutdown()
+
+def ingest_directory(root: str, index: PolicyIndex, workers: Optional[int] = None, batch_size: int = 256,
+                     concurrency: int = 4, prune: bool = False, retries: int = 4) -> Dict[str, Any]:
+    indexed = index.indexed_documents()
+    paths = {os.path.relpath(path, root).replace(os.sep, "/"): path for path in find_pdfs(root)}
+    ingester = BatchIngester(index, indexed, batch_size, concurrency, retries=retries)
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as parsers:
+        # Keep a bounded window of parse jobs so parsed text doesn't pile up ahead of embedding
+        window = 2 * workers
+        jobs: Dict[Future, str] = {}
+        for source, path in paths.items():
+            hashes = indexed.get(source, {}).get("doc_hashes", set())
+            jobs[parsers.submit(parse_document, path, source, hashes, index.chunk_size, index.chunk_overlap)] = source
+            while len(jobs) >= window:
+                done, _ = wait(list(jobs), return_when=FIRST_COMPLETED)
+                for job in done:
+                    _finish_job(job, jobs.pop(job), ingester)
+        for job in list(jobs):
+            _finish_job(job, jobs.pop(job), ingester)
+    ingester.finish()
+
+    totals = dict(ingester.totals)
+    if prune:
+        gone = [source for source in indexed if source not in paths]
+        totals["pruned_documents"] = len(gone)
+        totals["removed"] += index.delete_sources(gone)
+    return totals
+
+def _finish_job(job: Future, source: str, ingester: BatchIngester):
+    try:
+        doc = job.result()
+    except Exception as e:
+        ingester.fail(source, e)
+        return
+    ingester.add(doc)
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a directory of policy PDFs into the policy_agent index")
+    parser.add_argument("directory", help="Directory searched recursively for *.pdf")
+    parser.add_argument("--index-path", default=None, help="Chroma directory (default: POLICY_INDEX_PATH or db/)")
+    parser.add_argument("--workers", type=int, default=None, help="PDF parsing processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=256, help="Texts per embedding request")
+    parser.add_argument("--concurrency", type=int, default=4, help="Embedding requests in flight at once")
+    parser.add_argument("--retries", type=int, default=4, help="Retries per failed embedding request, with exponential backoff")
+    parser.add_argument("--chunk-size", type=int, default=1200)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--prune", action="store_true", help="Remove indexed documents that are no longer in the directory")
+    args = parser.parse_args()
+
+    load_dotenv()
+    logging.basicConfig(level=logging.WARNING)
+
+    index = PolicyIndex(path=args.index_path, chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    print(f"📥 Ingesting PDFs from {args.directory} into {index.path}")
+    started = time.perf_counter()
+    totals = ingest_directory(args.directory, index, args.workers, args.batch_size, args.concurrency, args.prune,
+                              args.retries)
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ {totals['documents']} documents in {elapsed:.1f}s: {totals['unchanged']} unchanged, {totals['written']} updated")
+    print(f"   chunks: {totals['added']} embedded ({totals['embed_calls']} requests), {totals['kept']} reused, {totals['removed']} removed")
+    if totals.get("pruned_documents"):
+        print(f"   pruned {totals['pruned_documents']} documents no longer in {args.directory}")
+    if totals["failed"]:
+        print(f"❌ {len(totals['failed'])} documents could not be ingested: {', '.join(totals['failed'][:10])}")
+    print(f"📚 Index now holds {index.count()} chunks")
+
+if __name__ == "__main__":
+    main()
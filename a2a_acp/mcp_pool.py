@@ -0,0 +1,169 @@
+"""
+Pool of warm MCP stdio sessions for smolagents agents.
+
+Spawning an MCP server (`uv run mcpserver.py`), doing the MCP handshake and
+listing its tools costs far more than a typical tool call, so the pool keeps
+`size` sessions running and lends them to agent runs:
+
+    pool = MCPToolPool(server_parameters, size=2)
+    pool.start()
+    with pool.tools() as tools:
+        agent = ToolCallingAgent(tools=tools, model=model)
+        agent.run(prompt)
+
+A session is pinged before it is lent out, and a session that fails a ping is
+closed and respawned, so a crashed server process is replaced transparently.
+Borrowers should pass a timeout: if every session stays busy that long,
+tools() raises MCPPoolExhaustedError instead of blocking the caller's thread.
+"""
+import asyncio
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, List, Optional, Tuple
+
+import mcpadapt
+from mcpadapt.core import MCPAdapt
+from mcpadapt.smolagents_adapter import SmolAgentsAdapter
+
+logger = logging.getLogger(__name__)
+
+class MCPPoolExhaustedError(TimeoutError):
+    """Raised when no session is returned to the pool within the borrower's timeout"""
+
+def _client_session(adapter: MCPAdapt) -> Tuple[Any, asyncio.AbstractEventLoop]:
+    """The MCP ClientSession behind a started MCPAdapt and the event loop it runs on.
+
+    mcpadapt has no public API for this, so this is the one place that reads
+    its internals (`sessions`, `loop`); if an mcpadapt upgrade changes them,
+    sessions fail to start with this error rather than failing health checks.
+    """
+    sessions = getattr(adapter, "sessions", None)
+    loop = getattr(adapter, "loop", None)
+    if not sessions or not isinstance(loop, asyncio.AbstractEventLoop):
+        raise RuntimeError(
+            f"mcpadapt {getattr(mcpadapt, '__version__', '?')} no longer exposes MCPAdapt.sessions/loop, "
+            "which mcp_pool uses to ping sessions; update mcp_pool._client_session"
+        )
+    return sessions[0], loop
+
+class _PooledSession:
+    """One running MCP server process plus the smolagents tools bound to it"""
+
+    def __init__(self, server_parameters: Any, connect_timeout: float):
+        self._adapter = MCPAdapt(server_parameters, SmolAgentsAdapter(), connect_timeout=connect_timeout)
+        self.tools: List[Any] = self._adapter.__enter__()
+        try:
+            self._session, self._loop = _client_session(self._adapter)
+        except Exception:
+            self.close()
+            raise
+
+    def ping(self, timeout: float) -> bool:
+        try:
+            asyncio.run_coroutine_threadsafe(self._session.send_ping(), self._loop).result(timeout)
+            return True
+        except Exception as e:
+            logger.warning("MCP session failed health check: %s", e)
+            return False
+
+    def close(self):
+        try:
+            self._adapter.__exit__(None, None, None)
+        except Exception as e:
+            logger.warning("Error closing MCP session: %s", e)
+
+class MCPToolPool:
+    """Fixed-size pool of MCP sessions that agent runs borrow and return"""
+
+    def __init__(self, server_parameters: Any, size: int = 2, connect_timeout: float = 30,
+                 health_check_timeout: float = 5):
+        self.server_parameters = server_parameters
+        self.size = size
+        self.connect_timeout = connect_timeout
+        self.health_check_timeout = health_check_timeout
+        # Each slot holds a live session, or None until it is (re)spawned
+        self._slots: "queue.Queue[Optional[_PooledSession]]" = queue.Queue()
+        for _ in range(size):
+            self._slots.put(None)
+        self._closed = False
+        self._lock = threading.Lock()
+        self.spawned = 0
+        self.restarted = 0
+
+    def _spawn(self) -> _PooledSession:
+        session = _PooledSession(self.server_parameters, self.connect_timeout)
+        with self._lock:
+            self.spawned += 1
+        logger.info("Started MCP session (%d tools)", len(session.tools))
+        return session
+
+    def start(self):
+        """Spawn every session up front so the first requests don't pay for it"""
+        sessions = []
+        for _ in range(self.size):
+            slot = self._slots.get()
+            try:
+                sessions.append(slot or self._spawn())
+            except Exception:
+                self._slots.put(None)
+                for session in sessions:
+                    self._slots.put(session)
+                raise
+        for session in sessions:
+            self._slots.put(session)
+
+    def _acquire(self, timeout: Optional[float]) -> _PooledSession:
+        try:
+            session = self._slots.get(timeout=timeout)
+        except queue.Empty:
+            raise MCPPoolExhaustedError(f"No MCP session became available within {timeout}s")
+        try:
+            if session is not None and not session.ping(self.health_check_timeout):
+                session.close()
+                session = None
+                with self._lock:
+                    self.restarted += 1
+            return session or self._spawn()
+        except Exception:
+            # Keep the slot so the pool never shrinks after a failed spawn
+            self._slots.put(None)
+            raise
+
+    @contextmanager
+    def tools(self, timeout: Optional[float] = None):
+        """Borrow a session's tools for the duration of the block, waiting up to timeout seconds for one"""
+        if self._closed:
+            raise RuntimeError("MCP tool pool is closed")
+        session = self._acquire(timeout)
+        try:
+            yield session.tools
+        except Exception:
+            # The run failed; only recycle the session if the server itself is gone
+            if not session.ping(self.health_check_timeout):
+                session.close()
+                session = None
+                with self._lock:
+                    self.restarted += 1
+            raise
+        finally:
+            if self._closed and session is not None:
+                session.close()
+            else:
+                self._slots.put(session)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": self.size, "idle": self._slots.qsize(), "spawned": self.spawned, "restarted": self.restarted}
+
+    def close(self):
+        """Stop every idle session; borrowed ones are stopped when returned"""
+        self._closed = True
+        while True:
+            try:
+                session = self._slots.get_nowait()
+            except queue.Empty:
+                return
+            if session is not None:
+                session.close()
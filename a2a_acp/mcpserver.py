@@ -1,9 +1,14 @@
 from colorama import Fore
 from mcp.server.fastmcp import FastMCP
-import json 
-import requests
+import json
+import logging
+from doctor_directory import DoctorDirectory, DirectoryUnavailableError
 
 mcp = FastMCP("doctorserver")
+
+# Loaded once and answered from in-memory indexes; see doctor_directory.py for
+# the DOCTORS_* settings (local file, TTL revalidation, offline snapshot)
+directory = DoctorDirectory()
     
 # Build server function
 @mcp.tool()
@@ -18,13 +23,43 @@ def list_doctors(state:str) -> str:
         Example Response "{"DOC001":{"name":"Dr John James", "specialty":"Cardiology"...}...}" 
         """
     
-    url = 'https://raw.githubusercontent.com/nicknochnack/ACPWalkthrough/refs/heads/main/doctors.json'
-    resp = requests.get(url)
-    doctors = json.loads(resp.text)
-
-    matches = [doctor for doctor in doctors.values() if doctor['address']['state'] == state]    
+    matches = directory.by_state(state)
     return str(matches) 
 
+SEARCH_MAX_LIMIT = 50
+
+@mcp.tool()
+def search_doctors(state: str = "", city: str = "", specialty: str = "", limit: int = 10, offset: int = 0,
+                   fields: str = "name,specialty,address") -> str:
+    """This tool searches the doctor directory and returns compact JSON.
+    Args:
+        state: two letter state code, e.g. "GA" (optional)
+        city: city name, e.g. "Atlanta" (optional)
+        specialty: medical specialty, e.g. "Cardiology" (optional)
+        limit: maximum number of doctors to return (default 10, max 50)
+        offset: number of matching doctors to skip, for paging
+        fields: comma separated doctor fields to include (default "name,specialty,address")
+
+    Returns:
+        str: JSON like {"total": 12, "offset": 0, "doctors": [{"id": "DOC001", "name": "Dr John James", ...}]}
+        """
+    limit = max(1, min(int(limit), SEARCH_MAX_LIMIT))
+    offset = max(0, int(offset))
+    wanted = [field.strip() for field in fields.split(",") if field.strip()]
+
+    matches = directory.search(state=state, city=city, specialty=specialty)
+    page = [
+        {"id": doctor_id, **({key: doctor[key] for key in wanted if key in doctor} if wanted else doctor)}
+        for doctor_id, doctor in matches[offset:offset + limit]
+    ]
+    return json.dumps({"total": len(matches), "offset": offset, "doctors": page}, separators=(",", ":"))
+
 # Kick off server if file is run 
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
\ No newline at end of file
+    # Warm the directory before the first tool call arrives; if it can't load yet,
+    # tool calls retry and report the error to the client
+    try:
+        directory.refresh()
+    except DirectoryUnavailableError as e:
+        logging.warning("%s", e)
+    mcp.run(transport="stdio")
@@ -0,0 +1,233 @@
+"""
+Persistent, incrementally updated vector index of the policy documents.
+
+Chunks live in the "policy_chunks" collection of the Chroma store in db/ and
+are keyed by a hash of their source and text, so ingesting a document again
+only embeds chunks that are new or changed, and deletes chunks that are gone:
+
+    index = PolicyIndex()
+    index.ingest("gold_hospital.pdf")   # no-op when the PDF hasn't changed
+    index.search("waiting period for rehabilitation")
+
+An unchanged document (same content hash) is skipped without being parsed.
+Embeddings use the Azure OpenAI deployment in AZURE_OPENAI_EMBEDDING_DEPLOYMENT.
+
+Configuration (environment variables):
+    POLICY_INDEX_PATH   Chroma directory (default: db/ next to this file)
+"""
+import hashlib
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Type
+
+import chromadb
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from pypdf import PdfReader
+
+logger = logging.getLogger(__name__)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INDEX_PATH = os.path.join(HERE, "db")
+COLLECTION_NAME = "policy_chunks"
+EMBED_BATCH_SIZE = 64
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def split_text(text: str, chunk_size: int = 1200, chunk_overlap: int = 200) -> List[str]:
+    """Split text into overlapping chunks, preferring paragraph, line and sentence breaks"""
+    text = text.strip()
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            # Break at the last natural boundary in the second half of the window
+            for separator in ("\n\n", "\n", ". ", " "):
+                cut = text.rfind(separator, start + chunk_size // 2, end)
+                if cut != -1:
+                    end = cut + len(separator)
+                    break
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        # Start the overlap on a word boundary
+        overlap_start = end - chunk_overlap
+        space = text.find(" ", overlap_start, end)
+        start = max(space + 1 if space != -1 else overlap_start, start + 1)
+    return chunks
+
+def azure_embedder(client: Any = None, deployment: Optional[str] = None) -> Callable[[List[str]], List[List[float]]]:
+    """Embedding function backed by an Azure OpenAI embeddings deployment"""
+    if client is None:
+        import openai
+        client = openai.AzureOpenAI(
+            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+            api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview"),
+            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
+        )
+    deployment = deployment or os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "text-embedding-ada-002")
+
+    def embed(texts: List[str]) -> List[List[float]]:
+        response = client.embeddings.create(model=deployment, input=texts)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    return embed
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as document:
+        for block in iter(lambda: document.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def chunk_pdf(path: str, source: str, chunk_size: int = 1200, chunk_overlap: int = 200) -> List[Dict[str, Any]]:
+    """Parse a PDF into chunk records (id, text, page), keyed by source and content hash"""
+    records = []
+    for page_number, page in enumerate(PdfReader(path).pages, start=1):
+        for chunk in split_text(page.extract_text() or "", chunk_size, chunk_overlap):
+            chunk_id = _sha256(f"{source}\0{chunk}".encode("utf-8"))[:32]
+            records.append({"id": chunk_id, "text": chunk, "page": page_number})
+    return records
+
+class PolicyIndex:
+    """Chroma collection of policy chunks with content-hash based incremental ingestion"""
+
+    def __init__(self, path: Optional[str] = None, embed: Optional[Callable[[List[str]], List[List[float]]]] = None,
+                 chunk_size: int = 1200, chunk_overlap: int = 200, collection_name: str = COLLECTION_NAME):
+        self.path = path or os.getenv("POLICY_INDEX_PATH", DEFAULT_INDEX_PATH)
+        self.embed = embed or azure_embedder()
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self._client = chromadb.PersistentClient(path=self.path)
+        # Embeddings are always supplied by us, so Chroma's default model is never loaded
+        self.collection = self._client.get_or_create_collection(
+            name=collection_name, embedding_function=None, metadata={"hnsw:space": "cosine"}
+        )
+
+    def chunk_document(self, path: str, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        return chunk_pdf(path, source or os.path.basename(path), self.chunk_size, self.chunk_overlap)
+
+    def _embed_in_batches(self, texts: Sequence[str]) -> List[List[float]]:
+        embeddings = []
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            embeddings.extend(self.embed(list(texts[start:start + EMBED_BATCH_SIZE])))
+        return embeddings
+
+    def indexed_documents(self) -> Dict[str, Dict[str, Set[str]]]:
+        """source -> {"doc_hashes": ..., "ids": ...} for everything in the collection"""
+        documents: Dict[str, Dict[str, Set[str]]] = {}
+        everything = self.collection.get(include=["metadatas"])
+        for chunk_id, metadata in zip(everything["ids"], everything["metadatas"]):
+            entry = documents.setdefault(metadata.get("source"), {"doc_hashes": set(), "ids": set()})
+            entry["doc_hashes"].add(metadata.get("doc_hash"))
+            entry["ids"].add(chunk_id)
+        return documents
+
+    def ingest(self, path: str, source: Optional[str] = None) -> Dict[str, int]:
+        """Bring the index in line with one document; returns counts of added/removed/kept chunks"""
+        source = source or os.path.basename(path)
+        doc_hash = file_hash(path)
+
+        existing = self.collection.get(where={"source": source}, include=["metadatas"])
+        if existing["ids"] and all(m.get("doc_hash") == doc_hash for m in existing["metadatas"]):
+            logger.info("%s unchanged, %d chunks already indexed", source, len(existing["ids"]))
+            return {"added": 0, "removed": 0, "kept": len(existing["ids"])}
+
+        return self.write_document(source, doc_hash, self.chunk_document(path, source))
+
+    def write_document(self, source: str, doc_hash: str, records: List[Dict[str, Any]],
+                       embeddings: Optional[Dict[str, List[float]]] = None) -> Dict[str, int]:
+        """Replace a document's chunks with records, embedding any chunk not already stored.
+
+        embeddings may supply precomputed vectors by chunk ID (see ingest_policies.py).
+        """
+        existing_ids = self.collection.get(where={"source": source}, include=[])["ids"]
+        # Identical chunks (e.g. repeated boilerplate) are stored once
+        records = list({record["id"]: record for record in records}.values())
+        wanted = {record["id"] for record in records}
+        present = set(existing_ids)
+
+        metadatas = {
+            record["id"]: {"source": source, "doc_hash": doc_hash, "page": record["page"]}
+            for record in records
+        }
+        # Order matters: the new hash is only on every chunk once the whole
+        # update has landed, so an interrupted ingest is redone next time
+        new = [record for record in records if record["id"] not in present]
+        if new:
+            texts = [record["text"] for record in new]
+            if embeddings is not None:
+                vectors = [embeddings[record["id"]] for record in new]
+            else:
+                vectors = self._embed_in_batches(texts)
+            self.collection.add(
+                ids=[record["id"] for record in new],
+                documents=texts,
+                embeddings=vectors,
+                metadatas=[metadatas[record["id"]] for record in new]
+            )
+
+        kept = [record for record in records if record["id"] in present]
+        if kept:
+            # Unchanged chunks keep their embedding; only the document hash moves on
+            self.collection.update(ids=[r["id"] for r in kept], metadatas=[metadatas[r["id"]] for r in kept])
+
+        stale = [chunk_id for chunk_id in existing_ids if chunk_id not in wanted]
+        if stale:
+            self.collection.delete(ids=stale)
+
+        logger.info("%s indexed: %d added, %d removed, %d kept", source, len(new), len(stale), len(kept))
+        return {"added": len(new), "removed": len(stale), "kept": len(kept)}
+
+    def delete_sources(self, sources: Sequence[str]) -> int:
+        """Drop every chunk of the given documents"""
+        removed = 0
+        for source in sources:
+            ids = self.collection.get(where={"source": source}, include=[])["ids"]
+            if ids:
+                self.collection.delete(ids=ids)
+                removed += len(ids)
+        return removed
+
+    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """The k chunks closest to the query, best first"""
+        available = self.collection.count()
+        if available == 0:
+            return []
+        result = self.collection.query(
+            query_embeddings=self.embed([query]), n_results=min(k, available), include=["documents", "metadatas", "distances"]
+        )
+        return [
+            {"id": chunk_id, "text": text, "source": metadata.get("source"), "page": metadata.get("page"), "distance": distance}
+            for chunk_id, text, metadata, distance in zip(
+                result["ids"][0], result["documents"][0], result["metadatas"][0], result["distances"][0]
+            )
+        ]
+
+    def signature(self) -> str:
+        """Changes whenever any chunk is added, removed or re-chunked (chunk IDs hash source and text)"""
+        return _sha256("\n".join(sorted(self.collection.get(include=[])["ids"])).encode("utf-8"))
+
+    def count(self) -> int:
+        return self.collection.count()
+
+class PolicySearchInput(BaseModel):
+    query: str = Field(..., description="What to look up in the policy documentation")
+
+class PolicySearchTool(BaseTool):
+    name: str = "search_policy"
+    description: str = "Searches the hospital insurance policy documentation and returns the most relevant passages."
+    args_schema: Type[BaseModel] = PolicySearchInput
+    # Anything with search(query, k): a PolicyIndex or a hybrid_search.HybridRetriever
+    retriever: Any = None
+    k: int = 5
+
+    def _run(self, query: str) -> str:
+        chunks = self.retriever.search(query, k=self.k)
+        if not chunks:
+            return "No matching policy passages found."
+        return "\n\n".join(f"[{chunk['source']} p.{chunk['page']}]\n{chunk['text']}" for chunk in chunks)
@@ -3,12 +3,16 @@ from acp_sdk.models import Message, MessagePart
 from acp_sdk.server import RunYield, RunYieldResume, Server
 
 from crewai import Crew, Task, Agent, LLM
-from crewai_tools import RagTool
 from langchain_openai import AzureChatOpenAI
 import openai
 import nest_asyncio
 import os
+import json
+import threading
 from dotenv import load_dotenv
+from llm_cache import cache_from_env
+from agent_factory import AgentFactory
+from readiness import Readiness, start_readiness_server
 
 load_dotenv()
 
@@ -34,60 +38,75 @@ def validate_azure_config():
     print(f"   API Key: {os.getenv('AZURE_OPENAI_API_KEY')[:8]}...")
     print(f"   Deployment: {os.getenv('AZURE_OPENAI_DEPLOYMENT', 'gpt-4o-mini')}")
 
-# Validate configuration first
-validate_azure_config()
+def configure_azure_env():
+    """Point LiteLLM and the OpenAI SDK at Azure (run after validate_azure_config)"""
+    # Remove conflicting OpenAI key and set proper Azure environment variables
+    if "OPENAI_API_KEY" in os.environ:
+        del os.environ["OPENAI_API_KEY"]
 
-# Remove conflicting OpenAI key and set proper Azure environment variables
-if "OPENAI_API_KEY" in os.environ:
-    del os.environ["OPENAI_API_KEY"]
+    # Set comprehensive Azure environment variables for all components
+    os.environ["OPENAI_API_TYPE"] = "azure"
+    os.environ["OPENAI_API_BASE"] = os.getenv("AZURE_OPENAI_ENDPOINT")
+    os.environ["OPENAI_API_KEY"] = os.getenv("AZURE_OPENAI_API_KEY")  # LiteLLM expects this for Azure
+    os.environ["OPENAI_API_VERSION"] = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
 
-# Set comprehensive Azure environment variables for all components
-os.environ["OPENAI_API_TYPE"] = "azure"
-os.environ["OPENAI_API_BASE"] = os.getenv("AZURE_OPENAI_ENDPOINT")
-os.environ["OPENAI_API_KEY"] = os.getenv("AZURE_OPENAI_API_KEY")  # LiteLLM expects this for Azure
-os.environ["OPENAI_API_VERSION"] = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
+    # Also set Azure-specific environment variables
+    os.environ["AZURE_API_KEY"] = os.getenv("AZURE_OPENAI_API_KEY")
+    os.environ["AZURE_API_BASE"] = os.getenv("AZURE_OPENAI_ENDPOINT")
+    os.environ["AZURE_API_VERSION"] = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
+    os.environ["AZURE_API_TYPE"] = "azure"
 
-# Also set Azure-specific environment variables
-os.environ["AZURE_API_KEY"] = os.getenv("AZURE_OPENAI_API_KEY")
-os.environ["AZURE_API_BASE"] = os.getenv("AZURE_OPENAI_ENDPOINT")
-os.environ["AZURE_API_VERSION"] = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
-os.environ["AZURE_API_TYPE"] = "azure"
+POLICY_DOCUMENTS = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "gold_hospital.pdf")]
 
 def setup_rag_tool():
-    """Setup RAG tool with simplified configuration"""
+    """Setup the policy search tool over the persistent, incrementally updated index"""
     
     try:
-        print("🔧 Initializing RAG tool with minimal config...")
-        config = {
-            "llm": {
-                "provider": "openai",  # Try openai provider with Azure format
-                "config": {
-                    "model": f"azure/{os.getenv('AZURE_OPENAI_DEPLOYMENT', 'gpt-4o-mini')}",
-                    "api_key": os.getenv("AZURE_OPENAI_API_KEY"),
-                    "api_version": os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview"),
-                }
-            },
-            "embedder": {
-                "provider": "openai",
-                "config": {
-                    "model": f"azure/{os.getenv('AZURE_OPENAI_EMBEDDING_DEPLOYMENT', 'text-embedding-ada-002')}",
-                    "api_key": os.getenv("AZURE_OPENAI_API_KEY"),
-                    "api_base": os.getenv("AZURE_OPENAI_ENDPOINT"),
-                    }
-            }
-        }
+        print("🔧 Initializing policy index...")
+        # Imported here so loading chromadb/pypdf doesn't delay server startup
+        from policy_index import PolicyIndex, PolicySearchTool
+        from hybrid_search import HybridRetriever
+        index = PolicyIndex(chunk_size=1200, chunk_overlap=200)
+        # Only new or changed chunks are embedded; an unchanged PDF isn't even parsed
+        for document in POLICY_DOCUMENTS:
+            counts = index.ingest(document)
+            print(f"   {os.path.basename(document)}: {counts['added']} embedded, {counts['removed']} removed, {counts['kept']} reused")
+        print(f"✅ Policy index ready ({index.count()} chunks)")
+        # BM25 over the same chunks, fused with vector search; keyword hits skip the embedding call
+        return PolicySearchTool(retriever=HybridRetriever(index)), True
         
-        rag_tool = RagTool(config=config, chunk_size=1200, chunk_overlap=200)
-        rag_tool.add("gold_hospital.pdf", data_type="pdf_file")
-        print("✅ RAG tool initialized with alternative config")
-        return rag_tool, True
-        
-    except Exception as e2:
-        print(f"❌ Alternative config also failed: {e2}")
+    except Exception as e:
+        print(f"❌ Policy index setup failed: {e}")
         print("🔄 Continuing without RAG capabilities")
         return None, False
 
-rag_tool, RAG_AVAILABLE = setup_rag_tool()
+# None unless LLM_CACHE_PATH is set
+llm_cache = cache_from_env()
+
+class CachedLLM(LLM):
+    """CrewAI LLM whose text completions are served from the shared LLM cache when possible"""
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, *args, **kwargs):
+        # With tools or functions the LLM may run them, so its answer isn't a pure function of the prompt
+        if llm_cache is None or tools or available_functions:
+            return super().call(messages, tools, callbacks, available_functions, *args, **kwargs)
+
+        key = llm_cache.make_key(
+            kind="crewai.llm",
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens
+        )
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return json.loads(cached)
+
+        response = super().call(messages, tools, callbacks, available_functions, *args, **kwargs)
+        # Only plain text answers are replayable
+        if isinstance(response, str):
+            llm_cache.set(key, json.dumps(response))
+        return response
 
 def setup_llm():
     """Setup LLM with complete Azure configuration"""
@@ -103,7 +122,7 @@ def setup_llm():
     os.environ["OPENAI_API_VERSION"] = api_version
     
     # Use CrewAI's LLM class with proper Azure configuration
-    return LLM(
+    return CachedLLM(
         model=f"azure/{deployment}",  # Azure format for LiteLLM
         api_key=api_key,
         base_url=endpoint,
@@ -114,31 +133,68 @@ def setup_llm():
         }
     )
 
-llm = setup_llm()
+# The LLM and RAG tool are built on a background thread (start_initialization)
+# so the server accepts connections immediately. States:
+#   starting -> warming (LLM ready, policy index building) -> ready | degraded (no RAG)
+#   starting -> failed (invalid configuration)
+readiness = Readiness("policy_agent")
+llm = None
+rag_tool = None
+_init_lock = threading.Lock()
+_init_started = False
 
-@server.agent()
-async def policy_agent(input: list[Message]) -> AsyncGenerator[RunYield, RunYieldResume]:
-    """This is an agent for questions around policy coverage, it uses a RAG pattern to find answers based on policy documentation. Use it to help answer questions on coverage and waiting periods."""
+# How long a request waits for the LLM, and then for the policy index, before
+# answering without RAG (0 = never wait for the index)
+LLM_WAIT_TIMEOUT = float(os.getenv("POLICY_LLM_WAIT_TIMEOUT", "30"))
+RAG_WAIT_TIMEOUT = float(os.getenv("POLICY_RAG_WAIT_TIMEOUT", "5"))
+RAG_READY_PORT = int(os.getenv("RAG_READY_PORT", "8011"))
+# Localhost by default; set RAG_READY_HOST=0.0.0.0 for a probe on another machine
+RAG_READY_HOST = os.getenv("RAG_READY_HOST", "127.0.0.1")
 
-    # Ensure Azure environment is properly set for this request
-    os.environ["OPENAI_API_TYPE"] = "azure"
-    os.environ["OPENAI_API_BASE"] = os.getenv("AZURE_OPENAI_ENDPOINT")
-    os.environ["OPENAI_API_KEY"] = os.getenv("AZURE_OPENAI_API_KEY")
-    os.environ["OPENAI_API_VERSION"] = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
-    
-    # Also set Azure-specific variables
-    os.environ["AZURE_API_KEY"] = os.getenv("AZURE_OPENAI_API_KEY")
-    os.environ["AZURE_API_BASE"] = os.getenv("AZURE_OPENAI_ENDPOINT")
-    os.environ["AZURE_API_VERSION"] = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
+def initialize():
+    global llm, rag_tool
+    try:
+        validate_azure_config()
+        configure_azure_env()
+        llm = setup_llm()
+    except Exception as e:
+        print(f"❌ policy_agent cannot start: {e}")
+        readiness.set("failed", "invalid Azure OpenAI configuration")
+        return
+
+    readiness.set("warming", "LLM ready, building policy index")
+    tool, available = setup_rag_tool()
+    if available:
+        rag_tool = tool
+        readiness.set("ready", "policy index loaded")
+    else:
+        readiness.set("degraded", "policy index unavailable, answering without RAG")
+    print(f"📚 RAG Available: {available} (warm after {readiness.snapshot()['warmup_s']}s)")
+
+def start_initialization():
+    """Start the background initialization once per process"""
+    global _init_started
+    with _init_lock:
+        if _init_started:
+            return
+        _init_started = True
+    threading.Thread(target=initialize, name="policy-agent-init", daemon=True).start()
+
+# The LLM, tools and agent settings are shared by every request; each request
+# builds its own Agent, Task and Crew around them (a crew.copy() rebuilds all
+# three anyway, so copying a template saves nothing)
+factory = AgentFactory("policy_agent")
 
+def build_policy_agent_config(rag_enabled: bool) -> dict:
+    """Agent settings that don't change between requests"""
     tools = []
-    if RAG_AVAILABLE and rag_tool:
+    if rag_enabled:
         tools.append(rag_tool)
-        backstory = "You are an expert insurance agent designed to assist with coverage queries. Use the RAG tool to search through policy documentation to provide accurate answers."
+        backstory = "You are an expert insurance agent designed to assist with coverage queries. Use the search_policy tool to search through policy documentation to provide accurate answers."
     else:
         backstory = "You are an expert insurance agent designed to assist with coverage queries. Provide helpful answers based on general insurance knowledge."
 
-    insurance_agent = Agent(
+    return dict(
         role="Senior Insurance Coverage Assistant", 
         goal="Determine whether something is covered or not",
         backstory=backstory,
@@ -148,14 +204,47 @@ async def policy_agent(input: list[Message]) -> AsyncGenerator[RunYield, RunYiel
         tools=tools, 
         max_retry_limit=3
     )
+
+def new_policy_crew(agent_config: dict, question: str) -> Crew:
+    """Per-run Agent, Task and Crew (they hold the run's task text and outputs)"""
+    insurance_agent = Agent(**agent_config)
     
     task1 = Task(
-         description=input[0].parts[0].content,
+         description=question,
          expected_output="A comprehensive response to the user's question about insurance coverage",
          agent=insurance_agent
     )
     
-    crew = Crew(agents=[insurance_agent], tasks=[task1], verbose=True)
+    return Crew(agents=[insurance_agent], tasks=[task1], verbose=True)
+
+@server.agent()
+async def policy_agent(input: list[Message]) -> AsyncGenerator[RunYield, RunYieldResume]:
+    """This is an agent for questions around policy coverage, it uses a RAG pattern to find answers based on policy documentation. Use it to help answer questions on coverage and waiting periods."""
+
+    start_initialization()
+    state = await readiness.wait_until({"warming", "ready", "degraded", "failed"}, LLM_WAIT_TIMEOUT)
+    if state == "warming":
+        # Give the index a moment; otherwise answer now without RAG rather than queueing behind warm-up
+        state = await readiness.wait_until({"ready", "degraded", "failed"}, RAG_WAIT_TIMEOUT)
+    if state not in ("warming", "ready", "degraded"):
+        detail = readiness.snapshot()["detail"] or "the agent is still starting"
+        yield Message(parts=[MessagePart(content=f"I'm sorry, the policy agent is not available yet ({detail}). Please try again shortly.")])
+        return
+
+    # Ensure Azure environment is properly set for this request
+    os.environ["OPENAI_API_TYPE"] = "azure"
+    os.environ["OPENAI_API_BASE"] = os.getenv("AZURE_OPENAI_ENDPOINT")
+    os.environ["OPENAI_API_KEY"] = os.getenv("AZURE_OPENAI_API_KEY")
+    os.environ["OPENAI_API_VERSION"] = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
+    
+    # Also set Azure-specific variables
+    os.environ["AZURE_API_KEY"] = os.getenv("AZURE_OPENAI_API_KEY")
+    os.environ["AZURE_API_BASE"] = os.getenv("AZURE_OPENAI_ENDPOINT")
+    os.environ["AZURE_API_VERSION"] = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
+
+    rag_enabled = state == "ready" and rag_tool is not None
+    agent_config = factory.shared(("policy_agent_config", rag_enabled), lambda: build_policy_agent_config(rag_enabled))
+    crew = factory.build(new_policy_crew, agent_config, input[0].parts[0].content)
     
     try:
         task_output = await crew.kickoff_async()
@@ -167,7 +256,9 @@ async def policy_agent(input: list[Message]) -> AsyncGenerator[RunYield, RunYiel
 
 if __name__ == "__main__":
     print("🚀 Starting RAG Agent Server on port 8001...")
-    print(f"📚 RAG Available: {RAG_AVAILABLE}")
+    print(f"🩺 Readiness on http://{RAG_READY_HOST}:{RAG_READY_PORT}/ready (policy index warms up in the background), counters on /stats")
+    start_readiness_server(readiness, RAG_READY_PORT, RAG_READY_HOST, stats=lambda: {"agent_factory": factory.stats()})
+    start_initialization()
     
     # Print configuration for debugging
     print("\n🔍 Configuration Check:")
@@ -0,0 +1,119 @@
+"""
+Readiness state for agents that warm up in the background, plus a tiny HTTP
+endpoint for orchestrators.
+
+The ACP server owns its port and routes, so readiness is served from a
+separate stdlib HTTP server:
+
+    GET /ready   200 once warm ("ready" or "degraded"), 503 otherwise
+    GET /health  200 while the process is up
+    GET /stats   the agent's runtime counters (when a stats callable is given)
+
+/ready and /health return only the state and a short reason as JSON; error
+details belong in the agent's log, not in a response anyone on the network can
+read. The server binds to localhost unless given another host.
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Collection, List, Optional, Tuple
+
+READY_STATES = frozenset({"ready", "degraded"})
+
+class Readiness:
+    """Thread-safe lifecycle state (e.g. starting -> warming -> ready) that async code can wait on"""
+
+    def __init__(self, name: str, state: str = "starting"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._state = state
+        self._detail = ""
+        self._started_at = time.monotonic()
+        self._warm_after: Optional[float] = None
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def set(self, state: str, detail: str = ""):
+        """detail is a short reason served on /ready; keep exception text out of it"""
+        with self._lock:
+            self._state = state
+            self._detail = detail
+            if state in READY_STATES and self._warm_after is None:
+                self._warm_after = time.monotonic() - self._started_at
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                # That waiter's event loop has already closed
+                pass
+
+    async def wait_until(self, states: Collection[str], timeout: float) -> str:
+        """Wait up to timeout seconds for one of states; returns the state at that point"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            with self._lock:
+                if self._state in states:
+                    return self._state
+                future = loop.create_future()
+                self._waiters.append((loop, future))
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return self._state
+            try:
+                await asyncio.wait_for(future, remaining)
+            except asyncio.TimeoutError:
+                return self._state
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self._state,
+                "ready": self._state in READY_STATES,
+                "detail": self._detail,
+                "uptime_s": round(time.monotonic() - self._started_at, 2),
+                "warmup_s": round(self._warm_after, 2) if self._warm_after is not None else None
+            }
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+def start_readiness_server(readiness: Readiness, port: int, host: str = "127.0.0.1",
+                           stats: Optional[Callable[[], dict]] = None) -> ThreadingHTTPServer:
+    """Serve /ready and /health for readiness (and /stats from stats()) on a daemon thread"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: Any):
+            pass
+
+        def do_GET(self):
+            path = self.path.split("?", 1)[0].rstrip("/")
+            snapshot = readiness.snapshot()
+            payload = {"status": snapshot["state"], "reason": snapshot["detail"]}
+            if path == "/ready":
+                status = 200 if snapshot["ready"] else 503
+            elif path in ("/health", ""):
+                status = 200
+            elif path == "/stats" and stats is not None:
+                status, payload = 200, stats()
+            else:
+                status, payload = 404, {"error": "unknown route"}
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, name=f"{readiness.name}-readiness", daemon=True).start()
+    return httpd
@@ -1,127 +1,645 @@
 """
 Simple Agent-to-Agent (A2A) Communication Framework
 This provides a basic HTTP-based agent communication system.
+
+The server can be served two ways:
+- WSGI (Flask), the default: ``server.run(...)``
+- ASGI, for high-concurrency workloads: ``server.run(..., asgi=True)`` or
+  point any ASGI server (e.g. uvicorn) at ``server.asgi_app``.
+
+In both modes async handlers run on a single long-lived event loop and sync
+handlers are offloaded to a bounded thread pool.
+
+Handlers may also be async generators. ``POST /task/stream`` streams each
+yielded chunk as it is produced (NDJSON, or Server-Sent Events when the
+client sends ``Accept: text/event-stream``); ``POST /task`` collects the
+chunks into a list.
+
+Read-only handlers can opt into a result cache (TTL + LRU) with
+``register_task_handler(name, cache_ttl=...)``; write handlers declare the
+cached tasks they make stale with ``invalidates=[...]``.
+
+A handler that raises TaskParamsError is answered with 400 and the message,
+instead of the 500 any other exception gets.
 """
 import asyncio
-from flask import Flask, request, jsonify
-from typing import Callable, Dict, Any
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, request, jsonify
+from typing import AsyncIterator, Callable, Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+class TaskParamsError(ValueError):
+    """Raised by a handler for invalid params; the request is answered with 400"""
+
+class TaskResultCache:
+    """Thread-safe LRU cache with a per-entry TTL for one task's results"""
+    
+    def __init__(self, ttl: float, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every clear so results computed before an invalidation are not stored
+        self._generation = 0
+        # Last value seen from the task's cache_version callable, if it has one
+        self._version: Any = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def make_key(params: Any) -> str:
+        """Canonicalize params so equivalent payloads share an entry"""
+        return json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    
+    @property
+    def generation(self) -> int:
+        return self._generation
+    
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+    
+    def put(self, key: str, value: Any, generation: int):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+    
+    def sync_version(self, version: Any):
+        """Drop every entry if the shared data version changed since the last call"""
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._entries.clear()
+                self._generation += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "ttl": self.ttl,
+                "max_entries": self.max_entries
+            }
 
 class A2AServer:
-    def __init__(self, agent_name: str, description: str = ""):
+    def __init__(self, agent_name: str, description: str = "", max_workers: int = 32, max_batch_size: int = 1000):
         self.agent_name = agent_name
         self.description = description
         self.app = Flask(__name__)
         self.task_handlers: Dict[str, Callable] = {}
+        self.task_caches: Dict[str, TaskResultCache] = {}
+        self.task_cache_versions: Dict[str, Callable[[], Any]] = {}
+        self.task_invalidations: Dict[str, List[str]] = {}
+        self.max_batch_size = max_batch_size
+        
+        # Sync handlers are offloaded to this pool so they never block the event loop
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{agent_name}-worker")
+        # Long-lived loop used to run async handlers when serving through Flask
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
         
         # Register default routes
         self.app.route('/task', methods=['POST'])(self._handle_task)
+        self.app.route('/tasks', methods=['POST'])(self._handle_tasks)
+        self.app.route('/task/stream', methods=['POST'])(self._handle_task_stream)
         self.app.route('/health', methods=['GET'])(self._health_check)
         self.app.route('/info', methods=['GET'])(self._agent_info)
     
-    def register_task_handler(self, task_name: str):
-        """Decorator to register a task handler"""
+    def register_task_handler(self, task_name: str, cache_ttl: Optional[float] = None, cache_max_entries: int = 256,
+                              invalidates: Optional[List[str]] = None, cache_version: Optional[Callable[[], Any]] = None):
+        """Decorator to register a task handler
+        
+        Args:
+            task_name: Name clients use to invoke the handler
+            cache_ttl: Cache results for this many seconds (read-only handlers only)
+            cache_max_entries: LRU bound on cached results for this task
+            invalidates: Cached tasks whose entries are dropped whenever this handler runs
+            cache_version: Blocking callable returning the version of data shared with other
+                processes; the task's cache is dropped whenever it changes (invalidates only
+                reaches this process's caches)
+        """
         def decorator(func: Callable):
+            if cache_ttl is not None:
+                if inspect.isasyncgenfunction(func):
+                    raise ValueError(f"Streaming task '{task_name}' cannot be cached")
+                self.task_caches[task_name] = TaskResultCache(cache_ttl, cache_max_entries)
+                if cache_version is not None:
+                    self.task_cache_versions[task_name] = cache_version
+            if invalidates:
+                self.task_invalidations[task_name] = list(invalidates)
             self.task_handlers[task_name] = func
             return func
         return decorator
     
-    def _handle_task(self):
-        """Handle incoming task requests"""
+    def _invalidate(self, task_name: str):
+        for cached_task in self.task_invalidations.get(task_name, []):
+            cache = self.task_caches.get(cached_task)
+            if cache is not None:
+                cache.clear()
+    
+    async def _run_handler(self, handler: Callable, params: Dict[str, Any]):
+        """Await async handlers in place, run sync handlers on the thread pool"""
+        if inspect.isasyncgenfunction(handler):
+            return [chunk async for chunk in handler(params)]
+        if asyncio.iscoroutinefunction(handler):
+            return await handler(params)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, handler, params)
+    
+    async def _iter_handler(self, task_name: str, handler: Callable, params: Dict[str, Any]) -> AsyncIterator[Any]:
+        """Yield a handler's chunks; plain handlers produce a single chunk"""
         try:
-            data = request.get_json()
-            task_name = data.get('task')
-            params = data.get('params', {})
-            
-            if task_name not in self.task_handlers:
-                return jsonify({"error": f"Task '{task_name}' not found"}), 400
+            if inspect.isasyncgenfunction(handler):
+                async for chunk in handler(params):
+                    yield chunk
+            else:
+                yield await self._run_handler(handler, params)
+        except Exception as e:
+            yield {"error": str(e)}
+        finally:
+            self._invalidate(task_name)
+    
+    def _resolve(self, data: Any) -> Tuple[Optional[Callable], Any, Optional[Dict[str, str]], int]:
+        """Validate a task payload, returning (handler, params, error, status)"""
+        if not isinstance(data, dict):
+            return None, None, {"error": "Request body must be a JSON object"}, 400
+        
+        task_name = data.get('task')
+        params = data.get('params') or {}
+        
+        if task_name not in self.task_handlers:
+            return None, None, {"error": f"Task '{task_name}' not found"}, 400
+        return self.task_handlers[task_name], params, None, 200
+    
+    async def _dispatch(self, data: Any) -> Tuple[Any, int]:
+        """Validate a task payload and execute its handler, returning (body, status)"""
+        try:
+            handler, params, error, status = self._resolve(data)
+            if error:
+                return error, status
             
-            # Execute the task handler
-            handler = self.task_handlers[task_name]
+            task_name = data['task']
+            cache = self.task_caches.get(task_name)
+            if cache is not None:
+                cache_version = self.task_cache_versions.get(task_name)
+                if cache_version is not None:
+                    # Catches writes made by other processes; the version read may block, so it runs on the pool
+                    loop = asyncio.get_running_loop()
+                    cache.sync_version(await loop.run_in_executor(self._executor, cache_version))
+                key = cache.make_key(params)
+                hit, cached = cache.get(key)
+                if hit:
+                    return cached, 200
+                generation = cache.generation
             
-            # Check if handler is async
-            if asyncio.iscoroutinefunction(handler):
-                # Run async handler in a new event loop
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    result = loop.run_until_complete(handler(params))
-                finally:
-                    loop.close()
-            else:
-                result = handler(params)
+            try:
+                result = await self._run_handler(handler, params)
+            finally:
+                self._invalidate(task_name)
             
-            return jsonify(result)
+            # Error results are not cached so a fixed input is retried next time
+            if cache is not None and not (isinstance(result, dict) and "error" in result):
+                cache.put(key, result, generation)
+            return result, 200
             
+        except TaskParamsError as e:
+            return {"error": str(e)}, 400
         except Exception as e:
-            return jsonify({"error": str(e)}), 500
+            return {"error": str(e)}, 500
     
-    def _health_check(self):
-        """Health check endpoint"""
-        return jsonify({
+    async def _dispatch_batch(self, data: Any) -> Tuple[Any, int]:
+        """Run a batch of task payloads concurrently, returning results in request order"""
+        tasks = data.get('tasks') if isinstance(data, dict) else None
+        if not isinstance(tasks, list):
+            return {"error": "Request body must be a JSON object with a 'tasks' list"}, 400
+        if len(tasks) > self.max_batch_size:
+            return {"error": f"Batch of {len(tasks)} tasks exceeds the limit of {self.max_batch_size}"}, 400
+        
+        # Per-item failures are reported in place; the batch itself still succeeds
+        outcomes = await asyncio.gather(*(self._dispatch(task) for task in tasks))
+        return {"results": [result for result, _ in outcomes]}, 200
+    
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Start (once) the background event loop shared by all Flask requests"""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name=f"{self.agent_name}-loop", daemon=True)
+                thread.start()
+                self._loop = loop
+            return self._loop
+    
+    def _run_coroutine(self, coro):
+        """Run a coroutine on the background loop from a Flask worker thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+    
+    def _handle_task(self):
+        """Handle incoming task requests"""
+        data = request.get_json(silent=True)
+        result, status = self._run_coroutine(self._dispatch(data))
+        return jsonify(result), status
+    
+    def _handle_tasks(self):
+        """Handle batched task requests"""
+        data = request.get_json(silent=True)
+        result, status = self._run_coroutine(self._dispatch_batch(data))
+        return jsonify(result), status
+    
+    def _handle_task_stream(self):
+        """Stream a task's chunks as they are produced"""
+        data = request.get_json(silent=True)
+        handler, params, error, status = self._resolve(data)
+        if error:
+            return jsonify(error), status
+        
+        sse = self._wants_sse(request.headers.get('Accept', ''))
+        chunks = self._iter_handler(data['task'], handler, params)
+        loop = self._get_loop()
+        
+        def generate() -> Iterator[bytes]:
+            try:
+                while True:
+                    try:
+                        chunk = asyncio.run_coroutine_threadsafe(chunks.__anext__(), loop).result()
+                    except StopAsyncIteration:
+                        return
+                    yield self._encode_chunk(chunk, sse)
+            finally:
+                # Runs on normal completion and when the client disconnects early
+                asyncio.run_coroutine_threadsafe(chunks.aclose(), loop).result()
+        
+        return Response(generate(), mimetype=self._stream_mimetype(sse))
+    
+    @staticmethod
+    def _wants_sse(accept: str) -> bool:
+        return "text/event-stream" in accept
+    
+    @staticmethod
+    def _stream_mimetype(sse: bool) -> str:
+        return "text/event-stream" if sse else "application/x-ndjson"
+    
+    @staticmethod
+    def _encode_chunk(chunk: Any, sse: bool) -> bytes:
+        line = json.dumps(chunk)
+        return f"data: {line}\n\n".encode("utf-8") if sse else f"{line}\n".encode("utf-8")
+    
+    def _health_payload(self) -> Dict[str, Any]:
+        return {
             "status": "healthy",
             "agent": self.agent_name,
             "description": self.description
-        })
+        }
     
-    def _agent_info(self):
-        """Agent information endpoint"""
-        return jsonify({
+    def _info_payload(self) -> Dict[str, Any]:
+        return {
             "agent_name": self.agent_name,
             "description": self.description,
-            "available_tasks": list(self.task_handlers.keys())
+            "available_tasks": list(self.task_handlers.keys()),
+            "cache": {task_name: cache.stats() for task_name, cache in self.task_caches.items()}
+        }
+    
+    def _health_check(self):
+        """Health check endpoint"""
+        return jsonify(self._health_payload())
+    
+    def _agent_info(self):
+        """Agent information endpoint"""
+        return jsonify(self._info_payload())
+    
+    async def asgi_app(self, scope, receive, send):
+        """ASGI entry point exposing the same routes as the Flask app"""
+        if scope["type"] == "lifespan":
+            await self._asgi_lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        
+        method = scope["method"]
+        path = scope["path"].rstrip("/") or "/"
+        
+        if path in ("/task", "/tasks") and method == "POST":
+            body = await self._read_body(receive)
+            try:
+                data = json.loads(body) if body else None
+            except json.JSONDecodeError:
+                await self._send_json(send, {"error": "Invalid JSON body"}, 400)
+                return
+            dispatch = self._dispatch if path == "/task" else self._dispatch_batch
+            result, status = await dispatch(data)
+            await self._send_json(send, result, status)
+        elif path == "/task/stream" and method == "POST":
+            await self._asgi_stream(scope, receive, send)
+        elif path == "/health" and method == "GET":
+            await self._send_json(send, self._health_payload())
+        elif path == "/info" and method == "GET":
+            await self._send_json(send, self._info_payload())
+        elif path in ("/task", "/tasks", "/task/stream", "/health", "/info"):
+            await self._send_json(send, {"error": "Method not allowed"}, 405)
+        else:
+            await self._send_json(send, {"error": f"Route '{path}' not found"}, 404)
+    
+    async def _asgi_stream(self, scope, receive, send):
+        body = await self._read_body(receive)
+        try:
+            data = json.loads(body) if body else None
+        except json.JSONDecodeError:
+            await self._send_json(send, {"error": "Invalid JSON body"}, 400)
+            return
+        
+        handler, params, error, status = self._resolve(data)
+        if error:
+            await self._send_json(send, error, status)
+            return
+        
+        headers = dict(scope.get("headers", []))
+        sse = self._wants_sse(headers.get(b"accept", b"").decode("latin-1"))
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", self._stream_mimetype(sse).encode("latin-1")),
+                (b"cache-control", b"no-cache"),
+            ],
+        })
+        chunks = self._iter_handler(data['task'], handler, params)
+        try:
+            async for chunk in chunks:
+                await send({"type": "http.response.body", "body": self._encode_chunk(chunk, sse), "more_body": True})
+        finally:
+            await chunks.aclose()
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    
+    async def _asgi_lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self._executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+        return body
+    
+    @staticmethod
+    async def _send_json(send, payload: Any, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
         })
+        await send({"type": "http.response.body", "body": body})
     
-    def run(self, host: str = "127.0.0.1", port: int = 8000, debug: bool = False):
-        """Run the agent server"""
+    def run(self, host: str = "127.0.0.1", port: int = 8000, debug: bool = False, asgi: bool = False):
+        """Run the agent server (Flask by default, uvicorn when asgi=True)"""
         print(f"🚀 Starting {self.agent_name} on {host}:{port}")
         print(f"📝 Description: {self.description}")
         print(f"🔧 Available tasks: {list(self.task_handlers.keys())}")
         
-        self.app.run(host=host, port=port, debug=debug)
+        if asgi:
+            import uvicorn
+            
+            print("⚡ Serving with ASGI (uvicorn)")
+            uvicorn.run(self.asgi_app, host=host, port=port, log_level="debug" if debug else "info")
+        else:
+            self.app.run(host=host, port=port, debug=debug, threaded=True)
+
+def _batch_payloads(tasks: Iterable[Any], batch_size: int) -> List[List[Dict[str, Any]]]:
+    """Normalize (task_name, params) tuples or task dicts into /tasks payload chunks"""
+    payloads = []
+    for task in tasks:
+        if isinstance(task, dict):
+            payloads.append({"task": task.get("task"), "params": task.get("params") or {}})
+        else:
+            task_name, params = task
+            payloads.append({"task": task_name, "params": params or {}})
+    return [payloads[i:i + batch_size] for i in range(0, len(payloads), batch_size)]
+
+def _batch_results(response: Any, size: int) -> List[Any]:
+    """Unpack a /tasks response, spreading a request-level error over every item"""
+    if "error" in response:
+        return [{"error": response["error"]}] * size
+    return response["results"]
 
 class A2AClient:
-    """Client for communicating with other A2A agents"""
+    """Client for communicating with another A2A agent.
     
-    @staticmethod
-    def send_task(agent_url: str, task_name: str, params: Dict[str, Any] = None):
-        """Send a task to another agent"""
+    Holds a keep-alive connection pool to a single agent URL, so repeated
+    calls reuse the same HTTP/1.1 connections. Use it as a context manager
+    (or call ``close()``) to release the pool.
+    """
+    
+    def __init__(self, agent_url: str, timeout: float = 30.0, pool_maxsize: int = 10):
         import requests
+        from requests.adapters import HTTPAdapter
         
-        if params is None:
-            params = {}
-        
+        self.agent_url = agent_url.rstrip("/")
+        self.timeout = timeout
+        self._requests = requests
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Close all pooled connections"""
+        self._session.close()
+    
+    def _request(self, method: str, path: str, error_prefix: str, timeout: Optional[float], **kwargs):
+        try:
+            response = self._session.request(
+                method,
+                f"{self.agent_url}{path}",
+                timeout=self.timeout if timeout is None else timeout,
+                **kwargs
+            )
+            response.raise_for_status()
+            return response.json()
+        except self._requests.RequestException as e:
+            return {"error": f"{error_prefix}: {str(e)}"}
+    
+    def send_task(self, task_name: str, params: Dict[str, Any] = None, timeout: Optional[float] = None):
+        """Send a task to the agent"""
         payload = {
             "task": task_name,
-            "params": params
+            "params": params or {}
         }
+        return self._request("POST", "/task", "Failed to communicate with agent", timeout, json=payload)
+    
+    def send_tasks(self, tasks: Iterable[Any], batch_size: int = 100, timeout: Optional[float] = None) -> List[Any]:
+        """Send many tasks through the /tasks batch endpoint.
         
+        ``tasks`` holds (task_name, params) tuples or {"task", "params"} dicts.
+        Results come back in the same order, with per-item {"error": ...} dicts.
+        """
+        results = []
+        for batch in _batch_payloads(tasks, batch_size):
+            response = self._request("POST", "/tasks", "Failed to communicate with agent", timeout, json={"tasks": batch})
+            results.extend(_batch_results(response, len(batch)))
+        return results
+    
+    def stream_task(self, task_name: str, params: Dict[str, Any] = None, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Stream a task's chunks from /task/stream as they arrive"""
+        payload = {
+            "task": task_name,
+            "params": params or {}
+        }
         try:
-            response = requests.post(f"{agent_url}/task", json=payload)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            return {"error": f"Failed to communicate with agent: {str(e)}"}
+            with self._session.post(
+                f"{self.agent_url}/task/stream",
+                json=payload,
+                stream=True,
+                timeout=self.timeout if timeout is None else timeout
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if line:
+                        yield json.loads(line)
+        except self._requests.RequestException as e:
+            yield {"error": f"Failed to communicate with agent: {str(e)}"}
     
-    @staticmethod
-    def get_agent_info(agent_url: str):
-        """Get information about an agent"""
-        import requests
+    def get_agent_info(self, timeout: Optional[float] = None):
+        """Get information about the agent"""
+        return self._request("GET", "/info", "Failed to get agent info", timeout)
+    
+    def health_check(self, timeout: Optional[float] = None):
+        """Check if the agent is healthy"""
+        return self._request("GET", "/health", "Agent health check failed", timeout)
+
+class AsyncA2AClient:
+    """Asyncio counterpart of A2AClient backed by a pooled httpx.AsyncClient.
+    
+    Use it as an async context manager (or ``await aclose()``) to release
+    the pool.
+    """
+    
+    def __init__(self, agent_url: str, timeout: float = 30.0, max_connections: int = 100):
+        import httpx
         
+        self.agent_url = agent_url.rstrip("/")
+        self.timeout = timeout
+        self._httpx = httpx
+        self._client = httpx.AsyncClient(
+            base_url=self.agent_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def aclose(self):
+        """Close all pooled connections"""
+        await self._client.aclose()
+    
+    async def _request(self, method: str, path: str, error_prefix: str, timeout: Optional[float], **kwargs):
         try:
-            response = requests.get(f"{agent_url}/info")
+            response = await self._client.request(
+                method,
+                path,
+                timeout=self.timeout if timeout is None else timeout,
+                **kwargs
+            )
             response.raise_for_status()
             return response.json()
-        except requests.RequestException as e:
-            return {"error": f"Failed to get agent info: {str(e)}"}
+        except self._httpx.HTTPError as e:
+            return {"error": f"{error_prefix}: {str(e)}"}
     
-    @staticmethod
-    def health_check(agent_url: str):
-        """Check if an agent is healthy"""
-        import requests
+    async def send_task(self, task_name: str, params: Dict[str, Any] = None, timeout: Optional[float] = None):
+        """Send a task to the agent"""
+        payload = {
+            "task": task_name,
+            "params": params or {}
+        }
+        return await self._request("POST", "/task", "Failed to communicate with agent", timeout, json=payload)
+    
+    async def send_tasks(self, tasks: Iterable[Any], batch_size: int = 100, timeout: Optional[float] = None) -> List[Any]:
+        """Send many tasks through the /tasks batch endpoint, with batches in flight concurrently.
         
+        ``tasks`` holds (task_name, params) tuples or {"task", "params"} dicts.
+        Results come back in the same order, with per-item {"error": ...} dicts.
+        """
+        batches = _batch_payloads(tasks, batch_size)
+        responses = await asyncio.gather(*(
+            self._request("POST", "/tasks", "Failed to communicate with agent", timeout, json={"tasks": batch})
+            for batch in batches
+        ))
+        results = []
+        for batch, response in zip(batches, responses):
+            results.extend(_batch_results(response, len(batch)))
+        return results
+    
+    async def stream_task(self, task_name: str, params: Dict[str, Any] = None, timeout: Optional[float] = None) -> AsyncIterator[Any]:
+        """Async iterator over a task's chunks from /task/stream as they arrive"""
+        payload = {
+            "task": task_name,
+            "params": params or {}
+        }
         try:
-            response = requests.get(f"{agent_url}/health")
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            return {"error": f"Agent health check failed: {str(e)}"}
+            async with self._client.stream(
+                "POST",
+                "/task/stream",
+                json=payload,
+                timeout=self.timeout if timeout is None else timeout
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line:
+                        yield json.loads(line)
+        except self._httpx.HTTPError as e:
+            yield {"error": f"Failed to communicate with agent: {str(e)}"}
+    
+    async def get_agent_info(self, timeout: Optional[float] = None):
+        """Get information about the agent"""
+        return await self._request("GET", "/info", "Failed to get agent info", timeout)
+    
+    async def health_check(self, timeout: Optional[float] = None):
+        """Check if the agent is healthy"""
+        return await self._request("GET", "/health", "Agent health check failed", timeout)
@@ -0,0 +1,128 @@
+"""
+Local product-intent extraction for the support agent.
+
+Resolves common requests like "Do we have laptops?" against the inventory
+agent's product list without an LLM call. parse() returns the product and a
+confidence score; callers fall back to the LLM when the score is low.
+
+Fuzzy matching only compares a candidate phrase with the few products that
+share the most character trigrams with it (and have a compatible length), so
+its cost doesn't grow with the whole catalog.
+"""
+import difflib
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Common synonyms, applied only when the target product exists in the catalog
+DEFAULT_ALIASES = {
+    "notebook": "laptop",
+    "notebooks": "laptop",
+    "cellphone": "phone",
+    "mobile": "phone",
+    "smartphone": "phone",
+    "mice": "mouse",
+    "screen": "monitor",
+    "display": "monitor",
+    "ipad": "tablet",
+}
+
+EXACT_CONFIDENCE = 1.0
+ALIAS_CONFIDENCE = 0.95
+AMBIGUOUS_CONFIDENCE = 0.4
+# Products per candidate phrase that get a full difflib comparison
+FUZZY_SHORTLIST = 10
+
+def _singular_forms(word: str) -> List[str]:
+    """The word itself plus naive singulars ("boxes" -> "box", "laptops" -> "laptop")"""
+    forms = [word]
+    if word.endswith("ies") and len(word) > 4:
+        forms.append(word[:-3] + "y")
+    if word.endswith("es") and len(word) > 3:
+        forms.append(word[:-2])
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 2:
+        forms.append(word[:-1])
+    return forms
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class LocalIntentParser:
+    """Match free text to a known product with exact, alias and fuzzy lookups"""
+
+    def __init__(self, products: Iterable[str], aliases: Optional[Dict[str, str]] = None,
+                 fuzzy_cutoff: float = 0.8, max_ngram: int = 3):
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.max_ngram = max_ngram
+        self._aliases = dict(DEFAULT_ALIASES if aliases is None else aliases)
+        self.update_products(products)
+
+    def update_products(self, products: Iterable[str]):
+        """Replace the known product list (e.g. after the catalog changes)"""
+        self._products = {product.lower().strip() for product in products if product}
+        self._product_list = sorted(self._products)
+        self._alias_map = {alias: product for alias, product in self._aliases.items() if product in self._products}
+        # Trigram -> indexes into _product_list, for the fuzzy shortlist
+        self._trigram_index: Dict[str, List[int]] = {}
+        for position, product in enumerate(self._product_list):
+            for gram in _trigrams(product):
+                self._trigram_index.setdefault(gram, []).append(position)
+
+    def _shortlist(self, candidate: str) -> List[str]:
+        """The products sharing the most trigrams with candidate that could still reach fuzzy_cutoff"""
+        shared = Counter()
+        for gram in _trigrams(candidate):
+            shared.update(self._trigram_index.get(gram, ()))
+        size = len(candidate)
+        shortlist = []
+        for position, _ in shared.most_common():
+            product = self._product_list[position]
+            # difflib's ratio is at most 2 * min(len) / (len + len)
+            if 2 * min(size, len(product)) / (size + len(product)) >= self.fuzzy_cutoff:
+                shortlist.append(product)
+                if len(shortlist) == FUZZY_SHORTLIST:
+                    break
+        return shortlist
+
+    def _candidates(self, text: str) -> List[str]:
+        words = re.findall(r"[a-z0-9]+", text.lower())
+        candidates = []
+        for size in range(self.max_ngram, 0, -1):
+            for start in range(len(words) - size + 1):
+                ngram = words[start:start + size]
+                for last in _singular_forms(ngram[-1]):
+                    phrase = ngram[:-1] + [last]
+                    candidates.append(" ".join(phrase))
+                    if size > 1:
+                        candidates.append("_".join(phrase))
+                        candidates.append("".join(phrase))
+        return candidates
+
+    def parse(self, text: str) -> Tuple[Optional[str], float]:
+        """Return (product, confidence); product is None when nothing matches"""
+        candidates = self._candidates(text)
+
+        exact = {candidate for candidate in candidates if candidate in self._products}
+        if len(exact) == 1:
+            return exact.pop(), EXACT_CONFIDENCE
+        if len(exact) > 1:
+            # Several products mentioned: let the LLM work out which one is meant
+            return sorted(exact)[0], AMBIGUOUS_CONFIDENCE
+
+        aliased = {self._alias_map[candidate] for candidate in candidates if candidate in self._alias_map}
+        if len(aliased) == 1:
+            return aliased.pop(), ALIAS_CONFIDENCE
+        if len(aliased) > 1:
+            return sorted(aliased)[0], AMBIGUOUS_CONFIDENCE
+
+        best, best_score = None, 0.0
+        for candidate in candidates:
+            # Short words ("do", "we", "any") fuzz-match far too easily
+            if len(candidate) < 4:
+                continue
+            for match in difflib.get_close_matches(candidate, self._shortlist(candidate), n=1, cutoff=self.fuzzy_cutoff):
+                score = difflib.SequenceMatcher(None, candidate, match).ratio()
+                if score > best_score:
+                    best, best_score = match, score
+        return best, best_score
@@ -1,6 +1,9 @@
-from a2a import A2AServer
+import asyncio
+import sys
+from a2a import A2AServer, TaskParamsError
+from inventory_store import create_inventory_store
 
-# Sample inventory data
+# Sample inventory data, used to seed an empty store
 inventory_data = {
     "laptop": 12,
     "phone": 5,
@@ -10,13 +13,34 @@ inventory_data = {
     "tablet": 7
 }
 
+# INVENTORY_STORE=sqlite (with INVENTORY_DB_PATH) persists stock across restarts
+store = create_inventory_store()
+if store.count() == 0:
+    store.upsert_many(inventory_data)
+
+# Tasks that must be dropped from the cache after any stock change
+STOCK_READ_TASKS = ["check_stock", "list_products", "list_out_of_stock"]
+# Writes only clear this process's caches; with a SQLite store shared by several
+# workers, the database's write counter also clears them after other workers' writes
+STOCK_VERSION = getattr(store, "generation", None)
+
 server = A2AServer(
     agent_name="InventoryAgent", 
     description="Manages and responds to inventory stock queries"
 )
 
-@server.register_task_handler("check_stock")
-async def check_stock(params):
+def _parse_quantity(value, name):
+    """Return (int value, error message)"""
+    if value is None:
+        return None, f"{name.capitalize()} parameter is required"
+    try:
+        return int(value), None
+    except (TypeError, ValueError):
+        return None, f"{name.capitalize()} must be a number"
+
+# Handlers are sync so store I/O runs on the server's worker pool, not its event loop
+@server.register_task_handler("check_stock", cache_ttl=30, cache_max_entries=1024, cache_version=STOCK_VERSION)
+def check_stock(params):
     """Check stock level for a specific product"""
     product = params.get("product", "").lower().strip()
     
@@ -24,12 +48,13 @@ async def check_stock(params):
         return {"error": "Product parameter is required"}
     
     # Check if product exists in inventory
-    stock_level = inventory_data.get(product)
+    stock_level = store.get(product)
     
     if stock_level is None:
-        available_products = list(inventory_data.keys())
+        available_products = [name for name, _ in store.items(limit=20)]
+        more = ", ..." if store.count() > len(available_products) else ""
         return {
-            "error": f"Product '{product}' not found. Available products: {', '.join(available_products)}"
+            "error": f"Product '{product}' not found. Available products: {', '.join(available_products)}{more}"
         }
     
     return {
@@ -38,60 +63,157 @@ async def check_stock(params):
         "status": "in_stock" if stock_level > 0 else "out_of_stock"
     }
 
-@server.register_task_handler("list_products")
-async def list_products(params):
-    """List all available products and their stock levels"""
+LIST_PRODUCTS_FIELDS = ("products", "total_items", "total_products", "out_of_stock_products")
+
+@server.register_task_handler("list_products", cache_ttl=30, cache_max_entries=256, cache_version=STOCK_VERSION)
+def list_products(params):
+    """List products and their stock levels, with running catalog totals
+    
+    Optional params:
+        limit: page size; when set, the response includes `next_cursor`
+        cursor: continue after this product (the previous page's `next_cursor`)
+        fields: subset of products, total_items, total_products, out_of_stock_products
+    """
+    fields = params.get("fields") or LIST_PRODUCTS_FIELDS
+    if isinstance(fields, str):
+        fields = [field.strip() for field in fields.split(",")]
+    if not isinstance(fields, (list, tuple)) or not all(isinstance(field, str) for field in fields):
+        raise TaskParamsError("Fields must be a list of field names or a comma-separated string")
+    unknown = [field for field in fields if field not in LIST_PRODUCTS_FIELDS]
+    if unknown:
+        raise TaskParamsError(f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(LIST_PRODUCTS_FIELDS)}")
+    
+    limit = params.get("limit")
+    if limit is not None:
+        limit, error = _parse_quantity(limit, "limit")
+        if error:
+            return {"error": error}
+        if limit <= 0:
+            return {"error": "Limit must be positive"}
+    
+    # Totals are maintained by the store on every write, so they never need a scan
+    result = {field: value for field, value in store.stats().items() if field in fields}
+    
+    if "products" in fields:
+        page = store.page(after=params.get("cursor"), limit=limit)
+        result["products"] = dict(page)
+        if limit is not None:
+            result["next_cursor"] = page[-1][0] if len(page) == limit else None
+    
+    return result
+
+@server.register_task_handler("list_out_of_stock", cache_ttl=30, cache_max_entries=1, cache_version=STOCK_VERSION)
+def list_out_of_stock(params):
+    """List products with zero stock (served from an index, no catalog scan)"""
+    products = store.out_of_stock()
     return {
-        "products": inventory_data,
-        "total_items": sum(inventory_data.values()),
-        "total_products": len(inventory_data)
+        "products": products,
+        "total_products": len(products)
     }
 
-@server.register_task_handler("update_stock")
-async def update_stock(params):
+@server.register_task_handler("stream_products")
+async def stream_products(params):
+    """Stream products one row at a time (use POST /task/stream)"""
+    cursor = None
+    while True:
+        # Store reads block (SQLite I/O), so each page is fetched off the event loop
+        page = await asyncio.to_thread(store.page, after=cursor, limit=500)
+        for product, stock in page:
+            yield {"product": product, "stock": stock}
+        if len(page) < 500:
+            return
+        cursor = page[-1][0]
+
+@server.register_task_handler("update_stock", invalidates=STOCK_READ_TASKS)
+def update_stock(params):
     """Update stock level for a product (for demo purposes)"""
     product = params.get("product", "").lower().strip()
-    quantity = params.get("quantity")
     
     if not product:
         return {"error": "Product parameter is required"}
     
-    if quantity is None:
-        return {"error": "Quantity parameter is required"}
+    quantity, error = _parse_quantity(params.get("quantity"), "quantity")
+    if error:
+        return {"error": error}
     
-    try:
-        quantity = int(quantity)
-    except ValueError:
-        return {"error": "Quantity must be a number"}
-    
-    if product not in inventory_data:
+    # The store clamps at zero, so stock never goes negative
+    result = store.set(product, quantity)
+    if result is None:
         return {"error": f"Product '{product}' not found"}
     
-    old_stock = inventory_data[product]
-    inventory_data[product] = max(0, quantity)  # Don't allow negative stock
+    old_stock, new_stock = result
+    return {
+        "product": product,
+        "old_stock": old_stock,
+        "new_stock": new_stock,
+        "message": f"Updated {product} stock from {old_stock} to {new_stock}"
+    }
+
+@server.register_task_handler("adjust_stock", invalidates=STOCK_READ_TASKS)
+def adjust_stock(params):
+    """Atomically increase (positive delta) or decrease (negative delta) a product's stock"""
+    product = params.get("product", "").lower().strip()
+    
+    if not product:
+        return {"error": "Product parameter is required"}
+    
+    delta, error = _parse_quantity(params.get("delta"), "delta")
+    if error:
+        return {"error": error}
     
+    result = store.adjust(product, delta)
+    if result is None:
+        return {"error": f"Product '{product}' not found"}
+    
+    old_stock, new_stock = result
     return {
         "product": product,
         "old_stock": old_stock,
-        "new_stock": inventory_data[product],
-        "message": f"Updated {product} stock from {old_stock} to {inventory_data[product]}"
+        "new_stock": new_stock,
+        "message": f"Adjusted {product} stock from {old_stock} to {new_stock}"
+    }
+
+@server.register_task_handler("bulk_update_stock", invalidates=STOCK_READ_TASKS)
+def bulk_update_stock(params):
+    """Set stock for many products in one atomic update: {"updates": {"laptop": 10, ...}}"""
+    updates = params.get("updates")
+    if not isinstance(updates, dict) or not updates:
+        return {"error": "Updates parameter must be a non-empty object of product -> quantity"}
+    
+    normalized = {}
+    for product, value in updates.items():
+        quantity, error = _parse_quantity(value, "quantity")
+        if error:
+            return {"error": f"{error} (product '{product}')"}
+        normalized[str(product).lower().strip()] = quantity
+    
+    changed, missing = store.bulk_set(normalized)
+    return {
+        "updated": {product: {"old_stock": old, "new_stock": new} for product, (old, new) in changed.items()},
+        "not_found": missing
     }
 
 if __name__ == "__main__":
     print("🏪 Starting Inventory Agent...")
-    print(f"📦 Managing {len(inventory_data)} products:")
-    for product, stock in inventory_data.items():
+    print(f"📦 Managing {store.count()} products ({store.stats()['total_items']} items):")
+    for product, stock in store.items(limit=20):
         status = "✅" if stock > 0 else "❌"
         print(f"   {status} {product}: {stock}")
     
     print("\n🚀 Server starting on http://127.0.0.1:9000")
     print("📋 Available tasks:")
     print("   • check_stock - Check stock for a product")
-    print("   • list_products - List all products")
+    print("   • list_products - List products (supports limit/cursor/fields)")
+    print("   • list_out_of_stock - List products with zero stock")
+    print("   • stream_products - Stream products row by row")
     print("   • update_stock - Update stock level")
+    print("   • adjust_stock - Atomically add/remove stock")
+    print("   • bulk_update_stock - Update many products at once")
     print("\n💡 Test endpoints:")
     print("   • GET  http://127.0.0.1:9000/health")
     print("   • GET  http://127.0.0.1:9000/info")
     print("   • POST http://127.0.0.1:9000/task")
+    print("   • POST http://127.0.0.1:9000/task/stream")
     
-    server.run(host="127.0.0.1", port=9000)
\ No newline at end of file
+    # Pass --asgi to serve with uvicorn for bursty, highly concurrent traffic
+    server.run(host="127.0.0.1", port=9000, asgi="--asgi" in sys.argv)
@@ -0,0 +1,290 @@
+"""
+Storage backends for the inventory agent.
+
+- InMemoryInventoryStore: a dict guarded by a lock, with an out-of-stock index
+- SQLiteInventoryStore: a persistent SQLite (WAL) store for large catalogs and
+  concurrent writers
+
+Both expose the same methods, so inventory_agent.py can switch between them
+with the INVENTORY_STORE environment variable. Stock never goes below zero.
+
+Catalog totals (items, products, out-of-stock products) are maintained
+incrementally on every write, so stats() is O(1), and page() walks the
+catalog in product order for cursor pagination.
+
+SQLiteInventoryStore also counts its write transactions in the database
+(generation()), so processes sharing one file can tell when another process
+has changed the stock and drop their cached reads.
+"""
+import bisect
+import os
+import sqlite3
+import threading
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+class InMemoryInventoryStore:
+    """Thread-safe in-memory inventory (lost on restart)"""
+
+    def __init__(self):
+        self._stock: Dict[str, int] = {}
+        self._out_of_stock = set()
+        # Product names in sorted order, for cursor pagination
+        self._sorted: List[str] = []
+        self._total_items = 0
+        self._lock = threading.RLock()
+
+    def _write(self, product: str, quantity: int, index: bool = True):
+        """index=False leaves a new product out of _sorted; the caller rebuilds it"""
+        old = self._stock.get(product)
+        if old is None:
+            if index:
+                bisect.insort(self._sorted, product)
+            old = 0
+        self._total_items += quantity - old
+        self._stock[product] = quantity
+        if quantity == 0:
+            self._out_of_stock.add(product)
+        else:
+            self._out_of_stock.discard(product)
+
+    def get(self, product: str) -> Optional[int]:
+        with self._lock:
+            return self._stock.get(product)
+
+    def set(self, product: str, quantity: int) -> Optional[Tuple[int, int]]:
+        """Set an existing product's stock, returning (old, new) or None if unknown"""
+        with self._lock:
+            old = self._stock.get(product)
+            if old is None:
+                return None
+            self._write(product, max(0, quantity))
+            return old, self._stock[product]
+
+    def adjust(self, product: str, delta: int) -> Optional[Tuple[int, int]]:
+        """Atomically add delta (may be negative), returning (old, new) or None if unknown"""
+        with self._lock:
+            old = self._stock.get(product)
+            if old is None:
+                return None
+            self._write(product, max(0, old + delta))
+            return old, self._stock[product]
+
+    def bulk_set(self, updates: Dict[str, int]) -> Tuple[Dict[str, Tuple[int, int]], List[str]]:
+        """Set many products at once, returning ({product: (old, new)}, unknown products)"""
+        changed, missing = {}, []
+        with self._lock:
+            for product, quantity in updates.items():
+                result = self.set(product, quantity)
+                if result is None:
+                    missing.append(product)
+                else:
+                    changed[product] = result
+        return changed, missing
+
+    def upsert_many(self, stock: Dict[str, int]):
+        """Create or overwrite products (used to seed the catalog)"""
+        with self._lock:
+            known = len(self._stock)
+            for product, quantity in stock.items():
+                self._write(product, max(0, quantity), index=False)
+            # One sort for the whole batch: an insort per new product is O(n^2) when seeding
+            if len(self._stock) != known:
+                self._sorted = sorted(self._stock)
+
+    def items(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        with self._lock:
+            return list(islice(self._stock.items(), limit))
+
+    def page(self, after: Optional[str] = None, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Products in name order, starting after the `after` cursor"""
+        with self._lock:
+            start = 0 if after is None else bisect.bisect_right(self._sorted, after)
+            end = len(self._sorted) if limit is None else start + limit
+            return [(product, self._stock[product]) for product in self._sorted[start:end]]
+
+    def out_of_stock(self) -> List[str]:
+        with self._lock:
+            return sorted(self._out_of_stock)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "total_items": self._total_items,
+                "total_products": len(self._stock),
+                "out_of_stock_products": len(self._out_of_stock)
+            }
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._stock)
+
+class SQLiteInventoryStore:
+    """Persistent inventory backed by SQLite in WAL mode.
+
+    Each thread gets its own connection; writes run in BEGIN IMMEDIATE
+    transactions so concurrent increments never lose updates.
+    """
+
+    def __init__(self, path: str = "inventory.db"):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS inventory (
+                product TEXT PRIMARY KEY,
+                stock INTEGER NOT NULL CHECK (stock >= 0)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_inventory_out_of_stock
+                ON inventory (product) WHERE stock = 0;
+
+            -- Single-row running totals kept in step with inventory by triggers
+            CREATE TABLE IF NOT EXISTS inventory_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total_items INTEGER NOT NULL,
+                total_products INTEGER NOT NULL,
+                out_of_stock_products INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO inventory_stats
+                SELECT 1, COALESCE(SUM(stock), 0), COUNT(*), COALESCE(SUM(stock = 0), 0) FROM inventory;
+
+            -- Bumped by every write transaction, so other processes can spot changes
+            CREATE TABLE IF NOT EXISTS inventory_generation (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                generation INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO inventory_generation VALUES (1, 0);
+
+            CREATE TRIGGER IF NOT EXISTS inventory_stats_insert AFTER INSERT ON inventory BEGIN
+                UPDATE inventory_stats SET
+                    total_items = total_items + NEW.stock,
+                    total_products = total_products + 1,
+                    out_of_stock_products = out_of_stock_products + (NEW.stock = 0)
+                WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS inventory_stats_update AFTER UPDATE OF stock ON inventory BEGIN
+                UPDATE inventory_stats SET
+                    total_items = total_items + NEW.stock - OLD.stock,
+                    out_of_stock_products = out_of_stock_products + (NEW.stock = 0) - (OLD.stock = 0)
+                WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS inventory_stats_delete AFTER DELETE ON inventory BEGIN
+                UPDATE inventory_stats SET
+                    total_items = total_items - OLD.stock,
+                    total_products = total_products - 1,
+                    out_of_stock_products = out_of_stock_products - (OLD.stock = 0)
+                WHERE id = 1;
+            END;
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self, work):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(conn)
+            conn.execute("UPDATE inventory_generation SET generation = generation + 1 WHERE id = 1")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def generation(self) -> int:
+        """Number of write transactions committed to the database by any process"""
+        return self._conn().execute("SELECT generation FROM inventory_generation WHERE id = 1").fetchone()[0]
+
+    @staticmethod
+    def _set(conn: sqlite3.Connection, product: str, quantity: int) -> Optional[Tuple[int, int]]:
+        row = conn.execute("SELECT stock FROM inventory WHERE product = ?", (product,)).fetchone()
+        if row is None:
+            return None
+        new = max(0, quantity)
+        conn.execute("UPDATE inventory SET stock = ? WHERE product = ?", (new, product))
+        return row[0], new
+
+    def get(self, product: str) -> Optional[int]:
+        row = self._conn().execute("SELECT stock FROM inventory WHERE product = ?", (product,)).fetchone()
+        return None if row is None else row[0]
+
+    def set(self, product: str, quantity: int) -> Optional[Tuple[int, int]]:
+        """Set an existing product's stock, returning (old, new) or None if unknown"""
+        return self._transaction(lambda conn: self._set(conn, product, quantity))
+
+    def adjust(self, product: str, delta: int) -> Optional[Tuple[int, int]]:
+        """Atomically add delta (may be negative), returning (old, new) or None if unknown"""
+        def work(conn):
+            row = conn.execute("SELECT stock FROM inventory WHERE product = ?", (product,)).fetchone()
+            if row is None:
+                return None
+            return self._set(conn, product, row[0] + delta)
+        return self._transaction(work)
+
+    def bulk_set(self, updates: Dict[str, int]) -> Tuple[Dict[str, Tuple[int, int]], List[str]]:
+        """Set many products in one transaction, returning ({product: (old, new)}, unknown products)"""
+        def work(conn):
+            changed, missing = {}, []
+            for product, quantity in updates.items():
+                result = self._set(conn, product, quantity)
+                if result is None:
+                    missing.append(product)
+                else:
+                    changed[product] = result
+            return changed, missing
+        return self._transaction(work)
+
+    def upsert_many(self, stock: Dict[str, int]):
+        """Create or overwrite products (used to seed the catalog)"""
+        rows = [(product, max(0, quantity)) for product, quantity in stock.items()]
+        self._transaction(lambda conn: conn.executemany(
+            "INSERT INTO inventory (product, stock) VALUES (?, ?) "
+            "ON CONFLICT (product) DO UPDATE SET stock = excluded.stock",
+            rows
+        ))
+
+    def items(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        return self._conn().execute(
+            "SELECT product, stock FROM inventory LIMIT ?", (-1 if limit is None else limit,)
+        ).fetchall()
+
+    def page(self, after: Optional[str] = None, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Products in name order, starting after the `after` cursor (uses the primary key)"""
+        return self._conn().execute(
+            "SELECT product, stock FROM inventory WHERE product > ? ORDER BY product LIMIT ?",
+            ("" if after is None else after, -1 if limit is None else limit)
+        ).fetchall()
+
+    def out_of_stock(self) -> List[str]:
+        rows = self._conn().execute("SELECT product FROM inventory WHERE stock = 0 ORDER BY product").fetchall()
+        return [row[0] for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        total_items, total_products, out_of_stock_products = self._conn().execute(
+            "SELECT total_items, total_products, out_of_stock_products FROM inventory_stats WHERE id = 1"
+        ).fetchone()
+        return {
+            "total_items": total_items,
+            "total_products": total_products,
+            "out_of_stock_products": out_of_stock_products
+        }
+
+    def count(self) -> int:
+        return self.stats()["total_products"]
+
+def create_inventory_store(kind: Optional[str] = None, path: Optional[str] = None):
+    """Build the store selected by INVENTORY_STORE ("memory" or "sqlite")"""
+    kind = (kind or os.getenv("INVENTORY_STORE", "memory")).lower()
+    if kind == "memory":
+        return InMemoryInventoryStore()
+    if kind == "sqlite":
+        return SQLiteInventoryStore(path or os.getenv("INVENTORY_DB_PATH", "inventory.db"))
+    raise ValueError(f"Unknown inventory store '{kind}' (expected 'memory' or 'sqlite')")
@@ -3,19 +3,64 @@ from openai import AzureOpenAI
 import json
 from dotenv import load_dotenv
 import os
+from collections import Counter
 from a2a import A2AClient
+from intent_parser import LocalIntentParser
+from llm_cache import with_llm_cache
 
 load_dotenv()
 
+INVENTORY_AGENT_URL = "http://127.0.0.1:9000"
+
+# One pooled client per agent URL so every query reuses a keep-alive connection
+inventory_client = A2AClient(INVENTORY_AGENT_URL, timeout=10.0)
+
+# Local matches at or above this confidence skip the LLM call
+LOCAL_INTENT_MIN_CONFIDENCE = float(os.getenv("LOCAL_INTENT_MIN_CONFIDENCE", "0.85"))
+
+# How many requests each path served ("local" or "llm"), to track the local hit rate
+interpret_stats = Counter()
+
 def get_azure_openai_client():
     azure_openai = AzureOpenAI(
         api_key=os.getenv("AZURE_OPENAI_API_KEY"),
         api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview"),
         azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
     )
-    return azure_openai
+    return with_llm_cache(azure_openai)
+
+def build_local_parser():
+    """Build a local intent parser from the inventory agent's product list"""
+    result = inventory_client.send_task("list_products", {"fields": ["products"]})
+    if "error" in result:
+        print(f"⚠️ Local intent parsing disabled, could not load products: {result['error']}")
+        return None
+    return LocalIntentParser(result["products"].keys())
 
-def interpret_request(user_request, openai_client):
+def interpret_request(user_request, openai_client, local_parser=None):
+    """Extract {"product": ...} from a user request.
+    
+    Tries the local parser first and only calls Azure OpenAI when it is
+    missing or not confident. The returned dict's "source" key says which
+    path served the request ("local" or "llm").
+    """
+    if local_parser is not None:
+        product, confidence = local_parser.parse(user_request)
+        if product and confidence >= LOCAL_INTENT_MIN_CONFIDENCE:
+            interpret_stats["local"] += 1
+            return {"product": product, "source": "local", "confidence": round(confidence, 2)}
+    
+    parsed = interpret_request_with_llm(user_request, openai_client)
+    interpret_stats["llm"] += 1
+    parsed["source"] = "llm"
+    return parsed
+
+def print_interpret_stats():
+    total = sum(interpret_stats.values())
+    if total:
+        print(f"📊 Intent parsing: {interpret_stats['local']}/{total} local, {interpret_stats['llm']}/{total} via LLM")
+
+def interpret_request_with_llm(user_request, openai_client):
     prompt = f"""
     Convert this user request into dict with a single key "product":
     Request: {user_request}
@@ -44,13 +89,12 @@ def interpret_request(user_request, openai_client):
 
 def request_inventory(product):
     """Request inventory information from the inventory agent"""
-    return A2AClient.send_task(
-        agent_url="http://127.0.0.1:9000",
+    return inventory_client.send_task(
         task_name="check_stock",
         params={"product": product}
     )
 
-def interactive_mode():
+def interactive_mode(local_parser=None):
     """Run in interactive mode for testing"""
     openai_client = get_azure_openai_client()
     
@@ -63,6 +107,7 @@ def interactive_mode():
             user_request = input("\nYou: ").strip()
             
             if user_request.lower() in ['quit', 'exit']:
+                print_interpret_stats()
                 print("👋 Goodbye!")
                 break
             
@@ -71,10 +116,10 @@ def interactive_mode():
             
             print(f"🔍 Processing: {user_request}")
             
-            # Parse the request using Azure OpenAI
+            # Parse the request locally, falling back to Azure OpenAI
             try:
-                parsed = interpret_request(user_request, openai_client)
-                print(f"📝 Understood: Looking for '{parsed.get('product')}'")
+                parsed = interpret_request(user_request, openai_client, local_parser)
+                print(f"📝 Understood ({parsed['source']}): Looking for '{parsed.get('product')}'")
             except Exception as e:
                 print(f"❌ Sorry, I couldn't understand that request: {e}")
                 continue
@@ -98,6 +143,7 @@ def interactive_mode():
                     print(f"📋 Sorry, {result['product']} is currently out of stock")
         
         except KeyboardInterrupt:
+            print_interpret_stats()
             print("\n👋 Goodbye!")
             break
         except Exception as e:
@@ -107,7 +153,7 @@ if __name__ == "__main__":
     print("🚀 Support Agent Starting...")
     
     # Check if inventory agent is available
-    health = A2AClient.health_check("http://127.0.0.1:9000")
+    health = inventory_client.health_check(timeout=5.0)
     if "error" in health:
         print("❌ Cannot connect to inventory agent. Make sure it's running on port 9000.")
         print("   Run: python inventory_agent.py")
@@ -115,6 +161,8 @@ if __name__ == "__main__":
     else:
         print(f"✅ Connected to: {health.get('agent', 'Inventory Agent')}")
     
+    local_parser = build_local_parser()
+    
     # Test with a sample request first
     print("\n📋 Testing with sample request...")
     openai_client = get_azure_openai_client()
@@ -122,9 +170,9 @@ if __name__ == "__main__":
     user_request = "Do we have laptops in stock?"
     print(f"User request: {user_request}")
     
-    # Parse the request using Azure OpenAI
+    # Parse the request locally, falling back to Azure OpenAI
     try:
-        parsed = interpret_request(user_request, openai_client)
+        parsed = interpret_request(user_request, openai_client, local_parser)
         print(f"Parsed request: {parsed}")
         
         product = parsed.get("product")
@@ -147,4 +195,4 @@ if __name__ == "__main__":
     
     # Enter interactive mode
     print("\n" + "="*50)
-    interactive_mode()
+    interactive_mode(local_parser)
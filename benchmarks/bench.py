@@ -0,0 +1,218 @@
+"""
+Concurrent load benchmark for the demo agents.
+
+Drives the agents' serving paths and reports throughput and p50/p95/p99
+latency. Start the agents first (pointed at fake_llm_server.py so no tokens are
+spent), then run one scenario or the whole suite:
+
+    python bench.py a2a --url http://127.0.0.1:9000 --task check_stock --params '{"product": "laptop"}'
+    python bench.py acp --url http://localhost:8000 --agent health_agent --input "Do I need rehab?"
+    python bench.py mcp --server ../mcp_project/research_server.py --tool extract_info --args '{"paper_id": "1234.5678"}'
+    python bench.py suite --requests 200 --concurrency 20 --json results.json
+
+--requests, --concurrency, --warmup and --json follow the scenario name. The
+suite skips scenarios whose agent refuses the connection; any other error fails
+the run.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(HERE)
+
+# Default scenarios for `suite`, one per serving path
+SUITE = [
+    {"name": "inventory_agent.check_stock", "kind": "a2a", "url": "http://127.0.0.1:9000",
+     "task": "check_stock", "params": {"product": "laptop"}},
+    {"name": "inventory_agent.list_products", "kind": "a2a", "url": "http://127.0.0.1:9000",
+     "task": "list_products", "params": {"fields": ["total_items", "total_products"]}},
+    {"name": "health_agent", "kind": "acp", "url": "http://localhost:8000",
+     "agent": "health_agent", "input": "Do I need rehabilitation after a shoulder reconstruction?"},
+    {"name": "doctor_agent", "kind": "acp", "url": "http://localhost:8000",
+     "agent": "doctor_agent", "input": "I'm based in Atlanta,GA. Are there any Cardiologists near me?"},
+    {"name": "policy_agent", "kind": "acp", "url": "http://localhost:8001",
+     "agent": "policy_agent", "input": "What is the waiting period for rehabilitation?"},
+    {"name": "research_server.extract_info", "kind": "mcp",
+     "server": os.path.join(REPO_ROOT, "mcp_project", "research_server.py"),
+     "tool": "extract_info", "args": {"paper_id": "0000.00000"}},
+]
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+async def run_load(call: Callable[[], Awaitable[Any]], requests: int, concurrency: int, warmup: int = 0) -> Dict[str, Any]:
+    """Issue `requests` calls with at most `concurrency` in flight and collect latency stats"""
+    for _ in range(warmup):
+        await call()
+
+    latencies: List[float] = []
+    errors: List[str] = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                result = await call()
+                if isinstance(result, dict) and "error" in result:
+                    errors.append(str(result["error"]))
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else None,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+async def bench_a2a(scenario: Dict[str, Any], requests: int, concurrency: int, warmup: int) -> Dict[str, Any]:
+    sys.path.insert(0, os.path.join(REPO_ROOT, "a2a_http"))
+    from a2a import AsyncA2AClient
+
+    async with AsyncA2AClient(scenario["url"], max_connections=concurrency) as client:
+        health = await client.health_check(timeout=2)
+        if "error" in health:
+            raise ConnectionError(health["error"])
+        return await run_load(
+            lambda: client.send_task(scenario["task"], scenario.get("params") or {}),
+            requests, concurrency, warmup
+        )
+
+async def bench_acp(scenario: Dict[str, Any], requests: int, concurrency: int, warmup: int) -> Dict[str, Any]:
+    from acp_sdk.client import Client
+
+    async with Client(base_url=scenario["url"]) as client:
+        # Fails fast when the server isn't running
+        [agent async for agent in client.agents()]
+
+        async def call():
+            run = await client.run_sync(agent=scenario["agent"], input=scenario["input"])
+            if getattr(run, "error", None):
+                return {"error": str(run.error)}
+            return run
+
+        return await run_load(call, requests, concurrency, warmup)
+
+async def bench_mcp(scenario: Dict[str, Any], requests: int, concurrency: int, warmup: int) -> Dict[str, Any]:
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    server = os.path.abspath(scenario["server"])
+    params = StdioServerParameters(command=sys.executable, args=[server], cwd=os.path.dirname(server))
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+
+            async def call():
+                result = await session.call_tool(scenario["tool"], arguments=scenario.get("args") or {})
+                if getattr(result, "isError", False):
+                    return {"error": str(result.content)}
+                return result
+
+            return await run_load(call, requests, concurrency, warmup)
+
+RUNNERS = {"a2a": bench_a2a, "acp": bench_acp, "mcp": bench_mcp}
+
+# Raised when an agent isn't running; the suite skips those scenarios
+UNREACHABLE_ERRORS = (ConnectionError, httpx.ConnectError, httpx.ConnectTimeout, requests.ConnectionError)
+
+def print_report(name: str, stats: Dict[str, Any]):
+    print(f"\n📊 {name}")
+    print(f"   requests={stats['requests']} concurrency={stats['concurrency']} errors={stats['errors']}")
+    print(f"   throughput={stats['throughput_rps']} req/s  mean={stats['mean_ms']}ms")
+    print(f"   p50={stats['p50_ms']}ms  p95={stats['p95_ms']}ms  p99={stats['p99_ms']}ms")
+    if stats.get("first_error"):
+        print(f"   first error: {stats['first_error']}")
+
+async def run_scenarios(scenarios: List[Dict[str, Any]], requests: int, concurrency: int, warmup: int,
+                        skip_unreachable: bool) -> Dict[str, Any]:
+    results = {}
+    for scenario in scenarios:
+        name = scenario["name"]
+        try:
+            stats = await RUNNERS[scenario["kind"]](scenario, requests, concurrency, warmup)
+        except UNREACHABLE_ERRORS as e:
+            if not skip_unreachable:
+                raise
+            print(f"\n⏭️  Skipping {name}: {type(e).__name__}: {e}")
+            results[name] = {"skipped": f"{type(e).__name__}: {e}"}
+            continue
+        print_report(name, stats)
+        results[name] = stats
+    return results
+
+def main(argv: Optional[List[str]] = None):
+    # Load options are shared by every scenario command
+    load = argparse.ArgumentParser(add_help=False)
+    load.add_argument("--requests", type=int, default=100, help="Measured calls per scenario")
+    load.add_argument("--concurrency", type=int, default=10, help="Calls in flight at once")
+    load.add_argument("--warmup", type=int, default=2, help="Unmeasured calls before each scenario")
+    load.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+
+    parser = argparse.ArgumentParser(description="Benchmark the demo agents under concurrent load")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    a2a = sub.add_parser("a2a", parents=[load], help="Benchmark an A2AServer task")
+    a2a.add_argument("--url", default="http://127.0.0.1:9000")
+    a2a.add_argument("--task", default="check_stock")
+    a2a.add_argument("--params", default='{"product": "laptop"}')
+
+    acp = sub.add_parser("acp", parents=[load], help="Benchmark an ACP agent run")
+    acp.add_argument("--url", default="http://localhost:8000")
+    acp.add_argument("--agent", default="health_agent")
+    acp.add_argument("--input", default="Do I need rehabilitation after a shoulder reconstruction?")
+
+    mcp = sub.add_parser("mcp", parents=[load], help="Benchmark an MCP tool over stdio")
+    mcp.add_argument("--server", default=os.path.join(REPO_ROOT, "mcp_project", "research_server.py"))
+    mcp.add_argument("--tool", default="extract_info")
+    mcp.add_argument("--args", default='{"paper_id": "0000.00000"}')
+
+    sub.add_parser("suite", parents=[load], help="Run every default scenario, skipping agents that aren't running")
+
+    args = parser.parse_args(argv)
+    if args.command == "suite":
+        scenarios, skip = SUITE, True
+    elif args.command == "a2a":
+        scenarios = [{"name": f"a2a:{args.task}", "kind": "a2a", "url": args.url, "task": args.task, "params": json.loads(args.params)}]
+        skip = False
+    elif args.command == "acp":
+        scenarios = [{"name": f"acp:{args.agent}", "kind": "acp", "url": args.url, "agent": args.agent, "input": args.input}]
+        skip = False
+    else:
+        scenarios = [{"name": f"mcp:{args.tool}", "kind": "mcp", "server": args.server, "tool": args.tool, "args": json.loads(args.args)}]
+        skip = False
+
+    results = asyncio.run(run_scenarios(scenarios, args.requests, args.concurrency, args.warmup, skip))
+    if args.json_path:
+        with open(args.json_path, "w") as json_file:
+            json.dump(results, json_file, indent=2)
+        print(f"\n💾 Results written to {args.json_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+"""
+Deterministic stand-in for the Azure OpenAI chat-completions and embeddings APIs.
+
+Point the agents at it instead of a real deployment to exercise the serving
+paths (A2AServer, the ACP servers, MCP_ChatBot) without spending tokens:
+
+    python fake_llm_server.py --port 8999 --latency-ms 200
+    set AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8999
+    set AZURE_OPENAI_API_KEY=fake
+
+Responses are derived from the request only, so the same prompt always gets
+the same answer. It understands just enough of each agent's prompting style to
+end a run in one or two turns:
+- smolagents ToolCallingAgent / MCP_ChatBot: calls the first non-final tool once
+  (arguments from --tool-args), then answers
+- smolagents CodeAgent: returns a code block calling final_answer(...)
+- CrewAI agents: returns "Final Answer: ..."
+- support_agent.interpret_request: returns {"product": ...}
+
+It also serves a stand-in arXiv API feed (GET /api/query) with deterministic
+papers for any query, and a small text PDF for any paper ID (GET /pdf/<id>),
+for the research server's search_papers and fetch_paper_text tools:
+
+    set ARXIV_FEED_URL=http://127.0.0.1:8999/api/query
+    set ARXIV_PDF_BASE_URL=http://127.0.0.1:8999/pdf
+"""
+import argparse
+import hashlib
+import json
+import math
+import re
+import struct
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_TOOL_ARGS = {
+    "list_doctors": {"state": "GA"},
+    "search_doctors": {"state": "GA", "specialty": "Cardiology", "limit": 5},
+    "search_papers": {"topic": "machine learning", "max_results": 3},
+    "search_local": {"query": "neural networks", "limit": 5},
+    "search_policy": {"query": "waiting period rehabilitation"},
+}
+
+def _digest(*parts: Any) -> bytes:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).digest()
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+class FakeLLM:
+    """Builds deterministic completions and embeddings"""
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, embedding_dim: int = 1536,
+                 tool_args: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.embedding_dim = embedding_dim
+        self.tool_args = {**DEFAULT_TOOL_ARGS, **(tool_args or {})}
+
+    def delay(self, key: bytes):
+        # Jitter is derived from the request, so a replayed workload has the same timing
+        jitter = (key[0] / 255.0) * self.jitter_ms
+        time.sleep((self.latency_ms + jitter) / 1000.0)
+
+    def answer_text(self, messages: List[Dict[str, Any]]) -> str:
+        last_user = next((_message_text(m) for m in reversed(messages) if m.get("role") == "user"), "")
+        tag = _digest(last_user).hex()[:8]
+        return f"Stand-in answer {tag} to: {last_user.strip()[:120]}"
+
+    def chat(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the assistant message dict for a chat-completions request"""
+        messages = body.get("messages") or []
+        tools = body.get("tools") or []
+        system = " ".join(_message_text(m) for m in messages if m.get("role") == "system")
+        prompt = "\n".join(_message_text(m) for m in messages)
+
+        if tools:
+            tool_names = [tool.get("function", {}).get("name") for tool in tools]
+            already_called = any(m.get("role") == "tool" or m.get("tool_calls") for m in messages)
+            candidates = [name for name in tool_names if name and name != "final_answer"]
+            if candidates and not already_called:
+                name = next((n for n in candidates if n in self.tool_args), candidates[0])
+                return self._tool_call(name, self.tool_args.get(name, {}), messages)
+            if "final_answer" in tool_names:
+                return self._tool_call("final_answer", {"answer": self.answer_text(messages)}, messages)
+            return {"role": "assistant", "content": self.answer_text(messages)}
+
+        if 'single key "product"' in prompt:
+            request_line = re.search(r"Request:\s*(.*)", prompt)
+            words = re.findall(r"[a-z]+", (request_line.group(1) if request_line else prompt).lower())
+            product = max(words, key=len, default="laptop").rstrip("s")
+            return {"role": "assistant", "content": json.dumps({"product": product})}
+
+        if "final_answer" in system:
+            answer = json.dumps(self.answer_text(messages))
+            if "<code>" in system:
+                content = f"Thought: I can answer directly.\n<code>\nfinal_answer({answer})\n</code>"
+            else:
+                content = f"Thought: I can answer directly.\nCode:\n```py\nfinal_answer({answer})\n```<end_code>"
+            return {"role": "assistant", "content": content}
+
+        if "Final Answer:" in prompt:
+            return {"role": "assistant", "content": f"Thought: I now know the final answer\nFinal Answer: {self.answer_text(messages)}"}
+
+        return {"role": "assistant", "content": self.answer_text(messages)}
+
+    @staticmethod
+    def _tool_call(name: str, arguments: Dict[str, Any], messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        call_id = "call_" + _digest(name, arguments, len(messages)).hex()[:16]
+        return {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": call_id,
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(arguments)},
+            }],
+        }
+
+    def embedding(self, text: str) -> List[float]:
+        """Unit-length pseudo-random vector seeded by the text"""
+        values = []
+        counter = 0
+        while len(values) < self.embedding_dim:
+            block = hashlib.sha256(f"{counter}:{text}".encode("utf-8")).digest()
+            values.extend(value / 2**31 for value in struct.unpack("<8i", block))
+            counter += 1
+        values = values[:self.embedding_dim]
+        norm = math.sqrt(sum(v * v for v in values)) or 1.0
+        return [v / norm for v in values]
+
+ARXIV_TOTAL_RESULTS = 50
+
+def arxiv_feed(query: str, start: int, max_results: int) -> bytes:
+    """Atom page of stand-in papers for an arXiv API query, same papers for the same query"""
+    entries = []
+    for index in range(start, min(start + max_results, ARXIV_TOTAL_RESULTS)):
+        digest = _digest(query, index).hex()
+        paper_id = f"{2400 + int(digest[:2], 16) % 24}.{int(digest[2:8], 16) % 100000:05d}"
+        topic = escape(query)
+        entries.append(f"""
+  <entry>
+    <id>http://arxiv.org/abs/{paper_id}v1</id>
+    <updated>2024-01-{1 + index % 28:02d}T00:00:00Z</updated>
+    <published>2024-01-{1 + index % 28:02d}T00:00:00Z</published>
+    <title>Stand-in paper {index + 1} on {topic}</title>
+    <summary>Deterministic abstract {digest[:8]} about {topic}.</summary>
+    <author><name>Author {digest[8:12]}</name></author>
+    <author><name>Author {digest[12:16]}</name></author>
+    <link href="http://arxiv.org/abs/{paper_id}v1" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/{paper_id}v1" rel="related" type="application/pdf"/>
+    <arxiv:primary_category term="cs.LG"/>
+    <category term="cs.LG"/>
+  </entry>""")
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom"
+      xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">
+  <title>arXiv stand-in query: {escape(query)}</title>
+  <opensearch:totalResults>{ARXIV_TOTAL_RESULTS}</opensearch:totalResults>
+  <opensearch:startIndex>{start}</opensearch:startIndex>
+  <opensearch:itemsPerPage>{max_results}</opensearch:itemsPerPage>{"".join(entries)}
+</feed>
+""".encode("utf-8")
+
+def stand_in_pdf(paper_id: str, pages: int = 3, lines_per_page: int = 30) -> bytes:
+    """Minimal multi-page PDF (Helvetica text) with deterministic content for paper_id"""
+    contents = []
+    for page in range(pages):
+        lines = [f"Stand-in paper {paper_id}, page {page + 1}"]
+        for line in range(lines_per_page):
+            digest = _digest(paper_id, page, line).hex()
+            lines.append(f"Line {line + 1}: deterministic text {digest[:12]} {digest[12:24]} for offline tests.")
+        ops = "\n".join(f"({text}) Tj T*" for text in lines)
+        contents.append(f"BT /F1 10 Tf 12 TL 50 780 Td\n{ops}\nET".encode("latin-1"))
+
+    page_ids = [4 + 2 * page for page in range(pages)]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{pid} 0 R' for pid in page_ids)}] /Count {pages} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for pid, content in zip(page_ids, contents):
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+                       f"/Contents {pid + 1} 0 R >>".encode())
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+def _usage(prompt: str, completion: str) -> Dict[str, int]:
+    prompt_tokens = len(prompt.split())
+    completion_tokens = len(completion.split())
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+def make_handler(llm: FakeLLM):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _read_json(self) -> Dict[str, Any]:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def _send_json(self, payload: Any, status: int = 200):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path.rstrip("/").endswith("/api/query"):
+                self._arxiv_query(parse_qs(url.query))
+            elif "/pdf/" in url.path:
+                paper_id = url.path.rsplit("/pdf/", 1)[1]
+                llm.delay(_digest(paper_id))
+                self._send_bytes(stand_in_pdf(paper_id), "application/pdf")
+            elif self.path.rstrip("/").endswith("/health") or self.path == "/":
+                self._send_json({"status": "ok"})
+            else:
+                self._send_json({"error": {"message": "Not found"}}, 404)
+
+        def do_POST(self):
+            path = self.path.split("?", 1)[0].rstrip("/")
+            try:
+                body = self._read_json()
+            except json.JSONDecodeError:
+                self._send_json({"error": {"message": "Invalid JSON"}}, 400)
+                return
+
+            if path.endswith("/chat/completions"):
+                self._chat(body)
+            elif path.endswith("/embeddings"):
+                self._embeddings(body)
+            else:
+                self._send_json({"error": {"message": f"Unknown route {path}"}}, 404)
+
+        def _arxiv_query(self, params: Dict[str, List[str]]):
+            query = (params.get("search_query") or [""])[0]
+            start = int((params.get("start") or ["0"])[0])
+            max_results = int((params.get("max_results") or ["10"])[0])
+            llm.delay(_digest(query, start, max_results))
+            self._send_bytes(arxiv_feed(query, start, max_results), "application/atom+xml; charset=utf-8")
+
+        def _send_bytes(self, body: bytes, content_type: str):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _chat(self, body: Dict[str, Any]):
+            key = _digest(body.get("messages"), body.get("tools"))
+            llm.delay(key)
+            message = llm.chat(body)
+            model = body.get("model") or "fake-model"
+            prompt = "\n".join(_message_text(m) for m in body.get("messages") or [])
+            usage = _usage(prompt, message.get("content") or "")
+            finish_reason = "tool_calls" if message.get("tool_calls") else "stop"
+            completion_id = "chatcmpl-" + key.hex()[:24]
+            created = int(time.time())
+
+            if body.get("stream"):
+                self._stream_chat(completion_id, created, model, message, finish_reason, usage, body)
+                return
+
+            self._send_json({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                "usage": usage,
+            })
+
+        def _stream_chat(self, completion_id, created, model, message, finish_reason, usage, body):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            def chunk(delta, finish=None, chunk_usage=None):
+                payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish}] if delta is not None else [],
+                }
+                if chunk_usage is not None:
+                    payload["usage"] = chunk_usage
+                self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+            chunk({"role": "assistant", "content": ""})
+            if message.get("tool_calls"):
+                calls = [{**call, "index": i} for i, call in enumerate(message["tool_calls"])]
+                chunk({"tool_calls": calls})
+            else:
+                # Word-sized deltas approximate token streaming
+                for piece in re.findall(r"\S+\s*|\s+", message.get("content") or ""):
+                    chunk({"content": piece})
+            chunk({}, finish_reason)
+            if (body.get("stream_options") or {}).get("include_usage"):
+                chunk(None, chunk_usage=usage)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+        def _embeddings(self, body: Dict[str, Any]):
+            inputs = body.get("input")
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            inputs = [str(item) for item in inputs or []]
+            llm.delay(_digest(inputs))
+            self._send_json({
+                "object": "list",
+                "model": body.get("model") or "fake-embedding",
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": llm.embedding(text)}
+                    for i, text in enumerate(inputs)
+                ],
+                "usage": {"prompt_tokens": sum(len(t.split()) for t in inputs), "total_tokens": sum(len(t.split()) for t in inputs)},
+            })
+
+    return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic fake Azure OpenAI server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Fixed latency added to every call")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Extra request-derived latency (0..jitter)")
+    parser.add_argument("--embedding-dim", type=int, default=1536)
+    parser.add_argument("--tool-args", default=None, help='JSON mapping tool name -> arguments, e.g. \'{"list_doctors": {"state": "CA"}}\'')
+    args = parser.parse_args()
+
+    llm = FakeLLM(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        embedding_dim=args.embedding_dim,
+        tool_args=json.loads(args.tool_args) if args.tool_args else None,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(llm))
+    server.daemon_threads = True
+    print(f"🧪 Fake LLM server on http://{args.host}:{args.port} (latency {args.latency_ms}ms + jitter {args.jitter_ms}ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("👋 Stopping fake LLM server")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Exact-match response cache for Azure OpenAI chat-completion calls.
+
+Entries are keyed on a hash of the model, messages, tools and sampling
+params, and live in an on-disk SQLite file so several agents (and restarts)
+can share them. Entries expire after a TTL and the least recently used ones
+are evicted once the cache grows past its size bound (checked every 1% of it).
+
+Streamed calls (stream=True) are cached too: the chunks are stored once the
+stream completes and a hit replays them as a stream, all at once.
+
+Caching is opt-in: set LLM_CACHE_PATH (and optionally LLM_CACHE_TTL,
+LLM_CACHE_MAX_ENTRIES) and wrap a client with ``with_llm_cache(client)``.
+Point every agent at the same LLM_CACHE_PATH to share one cache.
+
+This module sits at the repository root and is installed as a top-level module
+with the project (`pip install -e .`, also run by requirements.txt and uv), so
+every demo folder imports it as `llm_cache`.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+def _to_jsonable(value: Any) -> Any:
+    """Convert SDK objects (pydantic models, dataclasses) into plain JSON data"""
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if hasattr(value, "__dict__"):
+        return {key: item for key, item in vars(value).items() if not key.startswith("_")}
+    return str(value)
+
+class LLMCache:
+    """SQLite-backed cache with TTL expiry and LRU eviction"""
+
+    def __init__(self, path: str, ttl: Optional[float] = 86400, max_entries: int = 10000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # The size bound is checked every this many inserts, so it can be overshot by up to 1%
+        self.check_every = max(1, max_entries // 100)
+        self._inserts = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at);
+        """)
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    @staticmethod
+    def make_key(**request: Any) -> str:
+        """Hash a request (model, messages, tools, params...) into a cache key"""
+        canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), default=_to_jsonable)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and (self.ttl is None or now - row[1] < self.ttl):
+                self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO NOTHING",
+                (key, value, now, now)
+            )
+            if cursor.rowcount == 0:
+                # Replacing an existing entry doesn't grow the cache
+                self._conn.execute(
+                    "UPDATE llm_cache SET value = ?, created_at = ?, accessed_at = ? WHERE key = ?",
+                    (value, now, now, key)
+                )
+                return
+            self._inserts += 1
+            # Count the rows rather than keeping a tally (other processes sharing the file insert too),
+            # but only every check_every inserts
+            if self._inserts % self.check_every == 0 and self._count() > self.max_entries:
+                self._evict(now)
+
+    def _evict(self, now: float):
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at <= ?", (now - self.ttl,))
+        # Trim an extra 10% so eviction doesn't run on every insert at the bound
+        keep = int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM llm_cache WHERE key NOT IN "
+            "(SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT ?)",
+            (keep,)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": self._count(), "path": self.path}
+
+def cache_from_env() -> Optional[LLMCache]:
+    """Build the cache configured by LLM_CACHE_PATH, or None when caching is off"""
+    path = os.getenv("LLM_CACHE_PATH")
+    if not path:
+        return None
+    ttl = float(os.getenv("LLM_CACHE_TTL", "86400"))
+    return LLMCache(
+        path,
+        ttl=ttl if ttl > 0 else None,
+        max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+    )
+
+class _CachedCompletions:
+    def __init__(self, completions, cache: LLMCache):
+        self._completions = completions
+        self._cache = cache
+
+    def create(self, **kwargs):
+        if kwargs.get("stream"):
+            return self._create_stream(**kwargs)
+
+        from openai.types.chat import ChatCompletion
+
+        key = self._cache.make_key(kind="chat.completions", **kwargs)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return ChatCompletion.model_validate_json(cached)
+
+        response = self._completions.create(**kwargs)
+        self._cache.set(key, response.model_dump_json())
+        return response
+
+    def _create_stream(self, **kwargs):
+        """Streamed calls are cached as their list of chunks and replayed as a stream on a hit"""
+        from openai.types.chat import ChatCompletionChunk
+
+        key = self._cache.make_key(kind="chat.completions.stream", **kwargs)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return _ChunkStream([ChatCompletionChunk.model_validate_json(chunk) for chunk in json.loads(cached)])
+        return _ChunkStream(self._completions.create(**kwargs), record=(self._cache, key))
+
+    def __getattr__(self, name):
+        return getattr(self._completions, name)
+
+class _ChunkStream:
+    """Iterates chat-completion chunks like the SDK's Stream.
+
+    With record, the chunks are stored in the cache once the stream has been
+    read to the end; a stream closed or failing part-way is not cached.
+    """
+
+    def __init__(self, chunks, record: Optional[Tuple[LLMCache, str]] = None):
+        self._source = chunks
+        self._chunks = iter(chunks)
+        self._record = record
+        self._seen: List[str] = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            if self._record is not None:
+                cache, key = self._record
+                self._record = None
+                cache.set(key, json.dumps(self._seen))
+            raise
+        if self._record is not None:
+            self._seen.append(chunk.model_dump_json())
+        return chunk
+
+    def close(self):
+        self._record = None
+        close = getattr(self._source, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._source, name)
+
+class _CachedChat:
+    def __init__(self, chat, cache: LLMCache):
+        self.completions = _CachedCompletions(chat.completions, cache)
+        self._chat = chat
+
+    def __getattr__(self, name):
+        return getattr(self._chat, name)
+
+class CachedOpenAIClient:
+    """Wraps an (Azure)OpenAI client so chat.completions.create() goes through the cache.
+
+    Every other attribute is delegated to the wrapped client unchanged.
+    """
+
+    def __init__(self, client, cache: LLMCache):
+        self._client = client
+        self.cache = cache
+        self.chat = _CachedChat(client.chat, cache)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+def with_llm_cache(client, cache: Optional[LLMCache] = None):
+    """Return client wrapped with the given (or env-configured) cache, or unchanged if caching is off"""
+    cache = cache or cache_from_env()
+    if cache is None:
+        return client
+    return CachedOpenAIClient(client, cache)
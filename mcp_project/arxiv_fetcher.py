@@ -0,0 +1,54 @@
+"""
+arXiv search used by research_server.py's search_papers tool.
+
+A fetcher is any callable `(topic, max_results, sort_by) -> {paper_id: info}`;
+research_server.fetcher can be swapped for a stand-in in tests. ArxivFetcher,
+the default, reuses one `arxiv.Client` (and its HTTP session) for every search
+and serializes requests so arXiv's rate limit is respected across concurrent
+tool calls.
+
+Set ARXIV_FEED_URL to send the queries to another Atom feed with the arXiv API's
+query format, e.g. the stand-in in benchmarks/fake_llm_server.py:
+
+    ARXIV_FEED_URL=http://127.0.0.1:8999/api/query
+"""
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import arxiv
+
+SORT_CRITERIA = {
+    "relevance": arxiv.SortCriterion.Relevance,
+    "submitted": arxiv.SortCriterion.SubmittedDate,
+    "updated": arxiv.SortCriterion.LastUpdatedDate,
+}
+
+def paper_info(paper: arxiv.Result) -> Dict[str, Any]:
+    return {
+        'title': paper.title,
+        'authors': [author.name for author in paper.authors],
+        'summary': paper.summary,
+        'pdf_url': paper.pdf_url,
+        'published': str(paper.published.date())
+    }
+
+class ArxivFetcher:
+    """Fetches search results through one shared arxiv.Client"""
+
+    def __init__(self, feed_url: Optional[str] = None, delay_seconds: Optional[float] = None):
+        feed_url = feed_url or os.getenv("ARXIV_FEED_URL")
+        if delay_seconds is None:
+            # arXiv asks for one request every 3 seconds; a local feed needs no delay
+            delay_seconds = 0.0 if feed_url else 3.0
+        self.client = arxiv.Client(delay_seconds=delay_seconds)
+        if feed_url:
+            self.client.query_url_format = feed_url.rstrip("?") + "?{}"
+        self._lock = threading.Lock()
+
+    def __call__(self, topic: str, max_results: int, sort_by: str = "relevance") -> Dict[str, Dict[str, Any]]:
+        search = arxiv.Search(query=topic, max_results=max_results, sort_by=SORT_CRITERIA[sort_by])
+        with self._lock:
+            # Ask for no more than we keep (the default page is 100 results)
+            self.client.page_size = max(1, min(max_results, 100))
+            return {paper.get_short_id(): paper_info(paper) for paper in self.client.results(search)}
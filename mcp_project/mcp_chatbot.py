@@ -7,6 +7,7 @@ import asyncio
 import nest_asyncio
 import os
 import json
+from llm_cache import with_llm_cache
 
 nest_asyncio.apply()
 
@@ -17,11 +18,11 @@ class MCP_ChatBot:
     def __init__(self):
         # Initialize session and client objects
         self.session: ClientSession = None
-        self.azure_openai = AzureOpenAI(
+        self.azure_openai = with_llm_cache(AzureOpenAI(
             api_key=os.getenv("AZURE_OPENAI_API_KEY"),
             api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview"),
             azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-        )
+        ))
         self.available_tools: List[dict] = []
 
     async def process_query(self, query):
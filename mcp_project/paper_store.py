@@ -0,0 +1,373 @@
+"""
+Persistent paper index for research_server.py.
+
+Maps each arXiv paper ID to its metadata and the topics it was found under,
+in a SQLite database (WAL mode) next to the per-topic JSON files, so
+`extract_info` is a single primary-key lookup instead of a scan of every
+`papers/<topic>/papers_info.json`. It also caches the paper IDs returned for
+recent searches, so repeated `search_papers` calls skip arXiv.
+
+The database is the source of truth: papers are upserted one by one inside a
+transaction, so concurrent sessions sharing the `papers` directory never lose
+each other's results. The JSON files are an optional export, rebuilt from the
+database under the same write lock and swapped in atomically (temp file +
+rename) in compact form; when a paper changes, the export of every topic it
+belongs to is rebuilt, not just the topic being saved. `import_json_dir` pulls
+in files written before the index existed (or by another process), skipping
+files whose modification time hasn't changed since the last import.
+
+Titles, authors and summaries are also kept in an FTS5 full-text index
+(`papers_fts`, external content keyed by `papers.id`), maintained by triggers
+on `papers` so every write path keeps it current, and searched with bm25
+ranking by `search`. SQLite builds without FTS5
+fall back to a LIKE scan.
+"""
+import json
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+# Logs go to stderr; stdout is the MCP stdio channel
+logger = logging.getLogger(__name__)
+
+# bm25 column weights for papers_fts (title, authors, summary)
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+# Upper bound on the results search() returns
+MAX_SEARCH_LIMIT = 100
+
+PAPERS_TABLE = """
+    CREATE TABLE IF NOT EXISTS papers (
+        id INTEGER PRIMARY KEY,     -- stable rowid, keys the full-text index
+        paper_id TEXT NOT NULL UNIQUE,
+        title TEXT,
+        authors TEXT,               -- JSON array of names
+        summary TEXT,
+        pdf_url TEXT,
+        published TEXT
+    )
+"""
+
+# External-content index over papers: the text lives only in papers, and
+# every index change is addressed by rowid (papers.id), never by a scan
+FTS_SCHEMA = """
+    BEGIN IMMEDIATE;
+    CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+        title, authors, summary, content = 'papers', content_rowid = 'id', tokenize = 'porter unicode61'
+    );
+    CREATE TRIGGER IF NOT EXISTS papers_fts_insert AFTER INSERT ON papers BEGIN
+        INSERT INTO papers_fts (rowid, title, authors, summary)
+        VALUES (new.id, new.title, new.authors, new.summary);
+    END;
+    -- Re-saving an unchanged paper (the common case) leaves the index alone
+    CREATE TRIGGER IF NOT EXISTS papers_fts_update AFTER UPDATE OF title, authors, summary ON papers
+    WHEN old.title IS NOT new.title OR old.authors IS NOT new.authors OR old.summary IS NOT new.summary BEGIN
+        INSERT INTO papers_fts (papers_fts, rowid, title, authors, summary)
+        VALUES ('delete', old.id, old.title, old.authors, old.summary);
+        INSERT INTO papers_fts (rowid, title, authors, summary)
+        VALUES (new.id, new.title, new.authors, new.summary);
+    END;
+    CREATE TRIGGER IF NOT EXISTS papers_fts_delete AFTER DELETE ON papers BEGIN
+        INSERT INTO papers_fts (papers_fts, rowid, title, authors, summary)
+        VALUES ('delete', old.id, old.title, old.authors, old.summary);
+    END;
+    -- Index papers stored before the full-text index existed
+    INSERT INTO papers_fts (papers_fts) VALUES ('rebuild');
+    COMMIT;
+"""
+
+def search_terms(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())
+
+def topic_key(topic: str) -> str:
+    """Normalized topic, also used as the topic's directory name"""
+    return topic.lower().replace(" ", "_")
+
+def export_path(export_dir: str, topic: str) -> str:
+    """Where a topic's JSON export lives: <export_dir>/<topic key>/papers_info.json"""
+    return os.path.join(export_dir, topic_key(topic), "papers_info.json")
+
+def _write_json_atomic(path: str, payload: Any):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".papers_info-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as tmp_file:
+            json.dump(payload, tmp_file, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+class PaperStore:
+    """SQLite index of papers by ID, with the topics each one belongs to"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate_papers(conn)
+        conn.executescript(PAPERS_TABLE + """;
+            CREATE TABLE IF NOT EXISTS paper_topics (
+                topic TEXT NOT NULL,
+                paper_id TEXT NOT NULL,
+                PRIMARY KEY (topic, paper_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_paper_topics_paper ON paper_topics (paper_id);
+
+            -- Recent search results: normalized query -> paper IDs (JSON array)
+            CREATE TABLE IF NOT EXISTS search_cache (
+                query_key TEXT PRIMARY KEY,
+                paper_ids TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            ) WITHOUT ROWID;
+
+            -- Downloaded PDFs: paper ID -> SHA-256 of the file in the PDF cache
+            CREATE TABLE IF NOT EXISTS paper_files (
+                paper_id TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL
+            ) WITHOUT ROWID;
+
+            -- papers_info.json files already imported, by modification time
+            CREATE TABLE IF NOT EXISTS json_imports (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL
+            ) WITHOUT ROWID;
+        """)
+        self.fts = self._create_fts(conn)
+
+    @staticmethod
+    def _migrate_papers(conn: sqlite3.Connection):
+        """Rebuild a papers table from before the integer id column (it had no rowid to index by)"""
+        if not PaperStore._needs_migration(conn):
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have migrated while we waited for the lock
+            if PaperStore._needs_migration(conn):
+                for trigger in ("papers_fts_insert", "papers_fts_update", "papers_fts_delete"):
+                    conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+                conn.execute("DROP TABLE IF EXISTS papers_fts")
+                conn.execute("ALTER TABLE papers RENAME TO papers_old")
+                conn.execute(PAPERS_TABLE)
+                conn.execute("""
+                    INSERT INTO papers (paper_id, title, authors, summary, pdf_url, published)
+                    SELECT paper_id, title, authors, summary, pdf_url, published FROM papers_old
+                """)
+                conn.execute("DROP TABLE papers_old")
+                logger.info("Migrated papers table to an integer id for the full-text index")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _needs_migration(conn: sqlite3.Connection) -> bool:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(papers)")}
+        return bool(columns) and "id" not in columns
+
+    @staticmethod
+    def _create_fts(conn: sqlite3.Connection) -> bool:
+        """Create the full-text index and its triggers if missing; False if SQLite lacks FTS5"""
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'papers_fts'").fetchone():
+            return True
+        try:
+            conn.executescript(FTS_SCHEMA)
+            return True
+        except sqlite3.OperationalError as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.warning("Full-text index unavailable (%s); search falls back to LIKE", e)
+            return False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def upsert(self, topic: str, papers: Dict[str, Dict[str, Any]], export_dir: Optional[str] = None,
+               cache_key: Optional[str] = None) -> List[str]:
+        """Insert or update papers and record that they belong to topic.
+
+        With export_dir, the JSON exports of topic and of every other topic a
+        changed paper belongs to are rewritten in the same transaction, so
+        concurrent writers can't interleave stale exports; returns the export
+        paths written. With cache_key, the paper IDs are cached as that
+        search's result.
+        """
+        rows = [
+            (paper_id, info.get("title"), json.dumps(info.get("authors") or [], separators=(",", ":")),
+             info.get("summary"), info.get("pdf_url"), info.get("published"))
+            for paper_id, info in papers.items()
+        ]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            changed = []
+            for row in rows:
+                # Unchanged papers aren't rewritten, so their other topics' exports stay as they are
+                cursor = conn.execute("""
+                    INSERT INTO papers (paper_id, title, authors, summary, pdf_url, published)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (paper_id) DO UPDATE SET
+                        title = excluded.title, authors = excluded.authors, summary = excluded.summary,
+                        pdf_url = excluded.pdf_url, published = excluded.published
+                    WHERE title IS NOT excluded.title OR authors IS NOT excluded.authors
+                        OR summary IS NOT excluded.summary OR pdf_url IS NOT excluded.pdf_url
+                        OR published IS NOT excluded.published
+                """, row)
+                if cursor.rowcount:
+                    changed.append(row[0])
+            conn.executemany(
+                "INSERT OR IGNORE INTO paper_topics (topic, paper_id) VALUES (?, ?)",
+                [(topic_key(topic), paper_id) for paper_id in papers]
+            )
+            if cache_key is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO search_cache (query_key, paper_ids, fetched_at) VALUES (?, ?, ?)",
+                    (cache_key, json.dumps(list(papers), separators=(",", ":")), time.time())
+                )
+            exported = []
+            if export_dir is not None:
+                topics = {topic_key(topic)}
+                for paper_id in changed:
+                    topics.update(self.topics(paper_id))
+                for export_topic in sorted(topics):
+                    path = export_path(export_dir, export_topic)
+                    _write_json_atomic(path, self.topic_papers(export_topic))
+                    # Our own export is already in the index; don't re-import it
+                    conn.execute(
+                        "INSERT OR REPLACE INTO json_imports (path, mtime) VALUES (?, ?)", (path, os.path.getmtime(path))
+                    )
+                    exported.append(path)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return exported
+
+    @staticmethod
+    def _row_to_info(row: Sequence[Any]) -> Dict[str, Any]:
+        title, authors, summary, pdf_url, published = row
+        return {
+            "title": title,
+            "authors": json.loads(authors) if authors else [],
+            "summary": summary,
+            "pdf_url": pdf_url,
+            "published": published
+        }
+
+    def get(self, paper_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            "SELECT title, authors, summary, pdf_url, published FROM papers WHERE paper_id = ?", (paper_id,)
+        ).fetchone()
+        return self._row_to_info(row) if row else None
+
+    def topics(self, paper_id: str) -> List[str]:
+        return [topic for (topic,) in self._conn().execute(
+            "SELECT topic FROM paper_topics WHERE paper_id = ? ORDER BY topic", (paper_id,)
+        )]
+
+    def topic_papers(self, topic: str) -> Dict[str, Dict[str, Any]]:
+        """Every paper stored under topic, keyed by paper ID"""
+        rows = self._conn().execute("""
+            SELECT p.paper_id, p.title, p.authors, p.summary, p.pdf_url, p.published
+            FROM paper_topics t JOIN papers p ON p.paper_id = t.paper_id
+            WHERE t.topic = ? ORDER BY p.paper_id
+        """, (topic_key(topic),))
+        return {row[0]: self._row_to_info(row[1:]) for row in rows}
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Papers matching any word of query in title, authors or summary, best match first.
+
+        score is the negated bm25 rank (higher is better; only comparable
+        within one query), or the number of matching words without FTS5.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+        # SQLite treats a negative LIMIT as no limit
+        limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+        if self.fts:
+            match = " OR ".join(f'"{term}"' for term in terms)
+            rows = self._conn().execute(f"""
+                SELECT p.paper_id, p.title, p.authors, snippet(papers_fts, 2, '[', ']', '...', 24),
+                       bm25(papers_fts, {", ".join(map(str, FTS_WEIGHTS))}) AS rank
+                FROM papers_fts JOIN papers p ON p.id = papers_fts.rowid
+                WHERE papers_fts MATCH ? ORDER BY rank LIMIT ?
+            """, (match, limit)).fetchall()
+        else:
+            # Rank by the number of query words found anywhere in the paper
+            hits = " + ".join(["(title LIKE ? OR authors LIKE ? OR summary LIKE ?)"] * len(terms))
+            patterns = [f"%{term}%" for term in terms for _ in range(3)]
+            rows = self._conn().execute(f"""
+                SELECT paper_id, title, authors, substr(summary, 1, 200), -({hits}) AS rank
+                FROM papers WHERE rank < 0 ORDER BY rank LIMIT ?
+            """, (*patterns, limit)).fetchall()
+        return [
+            {"paper_id": paper_id, "title": title, "authors": json.loads(authors) if authors else [],
+             "snippet": snippet, "score": -rank}
+            for paper_id, title, authors, snippet, rank in rows
+        ]
+
+    def paper_file(self, paper_id: str) -> Optional[str]:
+        """SHA-256 of the paper's downloaded PDF, if any"""
+        row = self._conn().execute("SELECT sha256 FROM paper_files WHERE paper_id = ?", (paper_id,)).fetchone()
+        return row[0] if row else None
+
+    def set_paper_file(self, paper_id: str, sha256: str):
+        self._conn().execute("INSERT OR REPLACE INTO paper_files (paper_id, sha256) VALUES (?, ?)", (paper_id, sha256))
+
+    def cached_search(self, cache_key: str, ttl: float) -> Optional[List[str]]:
+        """Paper IDs cached for cache_key if fetched within the last ttl seconds"""
+        row = self._conn().execute(
+            "SELECT paper_ids FROM search_cache WHERE query_key = ? AND fetched_at >= ?", (cache_key, time.time() - ttl)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def prune_search_cache(self, ttl: float) -> int:
+        """Drop cached searches older than ttl seconds; returns rows removed"""
+        return self._conn().execute("DELETE FROM search_cache WHERE fetched_at < ?", (time.time() - ttl,)).rowcount
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def import_json_dir(self, paper_dir: str, export: bool = False) -> int:
+        """Import <paper_dir>/<topic>/papers_info.json files that are new or changed; returns papers imported.
+
+        With export, the exports of other topics whose papers the import changed are rebuilt as well.
+        """
+        if not os.path.isdir(paper_dir):
+            return 0
+        conn = self._conn()
+        imported = dict(conn.execute("SELECT path, mtime FROM json_imports"))
+        total = 0
+        for topic in os.listdir(paper_dir):
+            file_path = os.path.join(paper_dir, topic, "papers_info.json")
+            try:
+                mtime = os.path.getmtime(file_path)
+            except OSError:
+                continue
+            if imported.get(file_path) == mtime:
+                continue
+            try:
+                with open(file_path, "r") as json_file:
+                    papers_info = json.load(json_file)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning("Error reading %s: %s", file_path, e)
+                continue
+            exported = self.upsert(topic, papers_info, paper_dir if export else None)
+            if file_path not in exported:
+                conn.execute("INSERT OR REPLACE INTO json_imports (path, mtime) VALUES (?, ?)", (file_path, mtime))
+            total += len(papers_info)
+        return total
@@ -0,0 +1,160 @@
+"""
+Full text of saved papers for research_server.py's fetch_paper_text tool.
+
+PDFs are downloaded with httpx, at most `concurrency` at a time, and stored by
+content hash (`<PAPER_PDF_DIR>/<sha256>.pdf`), so a paper is downloaded once
+and identical files are stored once. Text is extracted with pypdf in a process
+pool (parsing is CPU-bound and would otherwise stall the MCP server) and
+cached next to the PDF as `<sha256>.txt`; papers.db remembers which file
+belongs to which paper ID.
+
+Set ARXIV_PDF_BASE_URL to download `<base>/<paper_id>` instead of the stored
+`pdf_url`, e.g. from the stand-in in benchmarks/fake_llm_server.py:
+
+    ARXIV_PDF_BASE_URL=http://127.0.0.1:8999/pdf
+"""
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+import httpx
+from pypdf import PdfReader
+
+from paper_store import PaperStore
+
+logger = logging.getLogger(__name__)
+
+MAX_PDF_BYTES = 50 * 1024 * 1024
+PAGE_SEPARATOR = "\n\n"
+
+def extract_text(pdf_path: str) -> str:
+    """Runs in a worker process: the text of every page of a PDF"""
+    reader = PdfReader(pdf_path)
+    pages = [(page.extract_text() or "").strip() for page in reader.pages]
+    return PAGE_SEPARATOR.join(page for page in pages if page)
+
+def _write_text_atomic(path: str, text: str):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".text-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+            tmp_file.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def text_chunk(text: str, offset: int, max_chars: int) -> Dict[str, Any]:
+    """Up to max_chars of text from offset, ending on whitespace where possible"""
+    offset = max(0, min(offset, len(text)))
+    end = min(offset + max_chars, len(text))
+    if end < len(text):
+        # Don't split a word: back up to the last whitespace in the chunk's final fifth
+        cut = max(text.rfind(" ", offset, end), text.rfind("\n", offset, end))
+        if cut > offset + max_chars * 4 // 5:
+            end = cut + 1
+    return {
+        "offset": offset,
+        "next_offset": end if end < len(text) else None,
+        "total_chars": len(text),
+        "text": text[offset:end]
+    }
+
+class PaperTextFetcher:
+    """Downloads, caches and extracts paper PDFs; concurrent requests for one paper share the work"""
+
+    def __init__(self, store: PaperStore, cache_dir: str, base_url: Optional[str] = None, concurrency: int = 4,
+                 workers: Optional[int] = None, max_bytes: int = MAX_PDF_BYTES):
+        self.store = store
+        self.cache_dir = cache_dir
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.concurrency = concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._parsers: Optional[ProcessPoolExecutor] = None
+        self._in_flight: Dict[str, "asyncio.Future[str]"] = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def close(self):
+        """Stop the parser processes; call when the server exits"""
+        if self._parsers is not None:
+            self._parsers.shutdown(cancel_futures=True)
+            self._parsers = None
+
+    def text_path(self, sha256: str) -> str:
+        return os.path.join(self.cache_dir, f"{sha256}.txt")
+
+    def pdf_path(self, sha256: str) -> str:
+        return os.path.join(self.cache_dir, f"{sha256}.pdf")
+
+    async def text(self, paper_id: str, pdf_url: Optional[str]) -> str:
+        """Full text of a paper, downloading and extracting it on first use"""
+        sha256 = self.store.paper_file(paper_id)
+        if sha256 is not None and os.path.exists(self.text_path(sha256)):
+            return await asyncio.to_thread(self._read_text, sha256)
+
+        task = self._in_flight.get(paper_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(paper_id, pdf_url))
+            self._in_flight[paper_id] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(paper_id, None))
+        # Shielded so one caller cancelling doesn't cancel the download for the others
+        return await asyncio.shield(task)
+
+    def _read_text(self, sha256: str) -> str:
+        with open(self.text_path(sha256), "r", encoding="utf-8") as text_file:
+            return text_file.read()
+
+    async def _fetch(self, paper_id: str, pdf_url: Optional[str]) -> str:
+        url = f"{self.base_url}/{paper_id}" if self.base_url else pdf_url
+        sha256 = self.store.paper_file(paper_id)
+        if sha256 is None or not os.path.exists(self.pdf_path(sha256)):
+            if not url:
+                raise ValueError(f"No PDF URL for paper {paper_id}")
+            sha256 = await self._download(url)
+        if not os.path.exists(self.text_path(sha256)):
+            if self._parsers is None:
+                # Spawned, not forked: forking the threaded asyncio server can deadlock the workers
+                self._parsers = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            loop = asyncio.get_running_loop()
+            text = await loop.run_in_executor(self._parsers, extract_text, self.pdf_path(sha256))
+            await asyncio.to_thread(_write_text_atomic, self.text_path(sha256), text)
+        else:
+            # Same file as a paper fetched before (e.g. another version ID)
+            text = await asyncio.to_thread(self._read_text, sha256)
+        await asyncio.to_thread(self.store.set_paper_file, paper_id, sha256)
+        logger.info("Extracted %d characters from %s", len(text), url)
+        return text
+
+    async def _download(self, url: str) -> str:
+        """Stream url into the cache directory under its SHA-256; returns the hash"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(follow_redirects=True, timeout=httpx.Timeout(60.0, connect=10.0))
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".download-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                async with self._semaphore:
+                    async with self._client.stream("GET", url) as response:
+                        response.raise_for_status()
+                        async for block in response.aiter_bytes():
+                            size += len(block)
+                            if size > self.max_bytes:
+                                raise ValueError(f"{url} is larger than {self.max_bytes} bytes")
+                            digest.update(block)
+                            tmp_file.write(block)
+            sha256 = digest.hexdigest()
+            os.replace(tmp_path, self.pdf_path(sha256))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        logger.info("Downloaded %s (%d bytes)", url, size)
+        return sha256
@@ -1,78 +1,108 @@
-import arxiv
+import asyncio
 import json
+import logging
 import os
-from typing import List
+import time
+from typing import Dict, List
 from mcp.server.fastmcp import FastMCP
+from arxiv_fetcher import SORT_CRITERIA, ArxivFetcher
+from paper_store import PaperStore
+from paper_text import PaperTextFetcher, text_chunk
 
 
 PAPER_DIR = "papers"
 
+# Logs go to stderr; stdout carries the MCP stdio protocol
+logger = logging.getLogger(__name__)
+
+# Index of every saved paper by ID; the per-topic JSON files are kept as an export
+store = PaperStore(os.getenv("PAPER_DB", os.path.join(PAPER_DIR, "papers.db")))
+# Set PAPER_JSON_EXPORT=0 to keep papers in the database only
+JSON_EXPORT = os.getenv("PAPER_JSON_EXPORT", "1") != "0"
+# Lookup misses rescan papers/ for JSON written by other processes at most this often (seconds)
+JSON_RESCAN_INTERVAL = float(os.getenv("PAPER_JSON_RESCAN_INTERVAL", "30"))
+_last_rescan = time.monotonic()
+# Seconds a search result is served from the cache before arXiv is asked again (0 disables)
+CACHE_TTL = float(os.getenv("ARXIV_CACHE_TTL", "3600"))
+
+# Any callable (topic, max_results, sort_by) -> {paper_id: info}; replace it to search a stand-in
+fetcher = ArxivFetcher()
+# Searches being fetched right now, so identical concurrent calls share one arXiv request
+_in_flight: Dict[str, "asyncio.Future[List[str]]"] = {}
+
+# Downloaded PDFs and their extracted text, stored by content hash
+paper_texts = PaperTextFetcher(
+    store,
+    os.getenv("PAPER_PDF_DIR", os.path.join(PAPER_DIR, "pdfs")),
+    base_url=os.getenv("ARXIV_PDF_BASE_URL"),
+    concurrency=int(os.getenv("PDF_DOWNLOAD_CONCURRENCY", "4"))
+)
+# Upper bound on the characters fetch_paper_text returns per call
+MAX_TEXT_CHARS = 20000
+
 # Initialize FastMCP server
 mcp = FastMCP("research")
 
+def import_external_json() -> int:
+    """Import papers_info.json files written outside this server, rate-limited so misses stay O(1)"""
+    global _last_rescan
+    now = time.monotonic()
+    if now - _last_rescan < JSON_RESCAN_INTERVAL:
+        return 0
+    _last_rescan = now
+    return store.import_json_dir(PAPER_DIR, export=JSON_EXPORT)
+
+def search_key(topic: str, max_results: int, sort_by: str) -> str:
+    """Cache key: case- and whitespace-insensitive topic plus the search options"""
+    return json.dumps([" ".join(topic.lower().split()), max_results, sort_by])
+
 @mcp.tool()
-def search_papers(topic: str, max_results: int = 5) -> List[str]:
+async def search_papers(topic: str, max_results: int = 5, sort_by: str = "relevance") -> List[str]:
     """
     Search for papers on arXiv based on a topic and store their information.
     
     Args:
         topic: The topic to search for
         max_results: Maximum number of results to retrieve (default: 5)
+        sort_by: "relevance", "submitted" or "updated" (default: "relevance")
         
     Returns:
         List of paper IDs found in the search
     """
-    
-    # Use arxiv to find the papers 
-    client = arxiv.Client()
+    if sort_by not in SORT_CRITERIA:
+        raise ValueError(f"sort_by must be one of {', '.join(SORT_CRITERIA)}")
 
-    # Search for the most relevant articles matching the queried topic
-    search = arxiv.Search(
-        query = topic,
-        max_results = max_results,
-        sort_by = arxiv.SortCriterion.Relevance
-    )
+    key = search_key(topic, max_results, sort_by)
+    if CACHE_TTL > 0:
+        cached = store.cached_search(key, CACHE_TTL)
+        if cached is not None:
+            logger.info("Cache hit for %r (%d papers)", topic, len(cached))
+            return cached
 
-    papers = client.results(search)
-    
-    # Create directory for this topic
-    path = os.path.join(PAPER_DIR, topic.lower().replace(" ", "_"))
-    os.makedirs(path, exist_ok=True)
-    
-    file_path = os.path.join(path, "papers_info.json")
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_and_store(topic, max_results, sort_by, key))
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    # Shielded so one caller cancelling doesn't cancel the fetch for the others
+    return await asyncio.shield(task)
 
-    # Try to load existing papers info
-    try:
-        with open(file_path, "r") as json_file:
-            papers_info = json.load(json_file)
-    except (FileNotFoundError, json.JSONDecodeError):
-        papers_info = {}
-
-    # Process each paper and add to papers_info  
-    paper_ids = []
-    for paper in papers:
-        paper_ids.append(paper.get_short_id())
-        paper_info = {
-            'title': paper.title,
-            'authors': [author.name for author in paper.authors],
-            'summary': paper.summary,
-            'pdf_url': paper.pdf_url,
-            'published': str(paper.published.date())
-        }
-        papers_info[paper.get_short_id()] = paper_info
-    
-    # Save updated papers_info to json file
-    with open(file_path, "w") as json_file:
-        json.dump(papers_info, json_file, indent=2)
+async def _fetch_and_store(topic: str, max_results: int, sort_by: str, key: str) -> List[str]:
+    # arXiv requests and SQLite writes block, so they run on worker threads while other tool calls are served
+    papers_info = await asyncio.to_thread(fetcher, topic, max_results, sort_by)
+
+    # One transaction upserts the papers, caches the result and, if enabled, atomically rewrites the JSON export of the
+    # topic and of any other topic a changed paper belongs to; only the papers found now are written
+    exported = await asyncio.to_thread(store.upsert, topic, papers_info, PAPER_DIR if JSON_EXPORT else None, key)
     
-    print(f"Results are saved in: {file_path}")
+    logger.info("Saved %d papers for %r%s", len(papers_info), topic, f" (exported to {', '.join(exported)})" if exported else "")
     
-    return paper_ids
+    return list(papers_info)
 
 @mcp.tool()
 def extract_info(paper_id: str) -> str:
     """
-    Search for information about a specific paper across all topic directories.
+    Look up information about a specific paper saved by any previous search.
     
     Args:
         paper_id: The ID of the paper to look for
@@ -81,23 +111,77 @@ def extract_info(paper_id: str) -> str:
         JSON string with paper information if found, error message if not found
     """
  
-    for item in os.listdir(PAPER_DIR):
-        item_path = os.path.join(PAPER_DIR, item)
-        if os.path.isdir(item_path):
-            file_path = os.path.join(item_path, "papers_info.json")
-            if os.path.isfile(file_path):
-                try:
-                    with open(file_path, "r") as json_file:
-                        papers_info = json.load(json_file)
-                        if paper_id in papers_info:
-                            return json.dumps(papers_info[paper_id], indent=2)
-                except (FileNotFoundError, json.JSONDecodeError) as e:
-                    print(f"Error reading {file_path}: {str(e)}")
-                    continue
+    paper_info = store.get(paper_id)
+    if paper_info is None and import_external_json():
+        # Pick up papers_info.json files written outside this server since startup
+        paper_info = store.get(paper_id)
+    if paper_info is not None:
+        return json.dumps(paper_info, indent=2)
     
     return f"There's no saved information related to paper {paper_id}."
 
+@mcp.tool()
+def search_local(query: str, limit: int = 5) -> str:
+    """
+    Search the papers saved by previous searches, without contacting arXiv.
+    Matches words in titles, authors and summaries, best match first.
+
+    Args:
+        query: Words to look for, e.g. "attention transformers" or an author's name
+        limit: Maximum number of papers to return (default: 5, at most 100)
+
+    Returns:
+        JSON string with the matching paper IDs, titles, authors and summary excerpts
+    """
+
+    results = store.search(query, limit)
+    if not results and import_external_json():
+        # Pick up papers_info.json files written outside this server since startup
+        results = store.search(query, limit)
+    if results:
+        return json.dumps(results, indent=2)
+
+    return f"No saved papers match {query!r}. Use search_papers to search arXiv."
+
+@mcp.tool()
+async def fetch_paper_text(paper_id: str, offset: int = 0, max_chars: int = 8000) -> str:
+    """
+    Read the full text of a saved paper's PDF, one chunk at a time.
+    Call again with the returned next_offset to continue reading.
+
+    Args:
+        paper_id: The ID of a paper saved by search_papers
+        offset: Character offset to start reading from (default: 0)
+        max_chars: Maximum number of characters to return (default: 8000, at most 20000)
+
+    Returns:
+        JSON string with the chunk's text, offset, next_offset (null at the end) and total_chars, or an error message
+    """
+
+    paper_info = store.get(paper_id)
+    if paper_info is None and import_external_json():
+        paper_info = store.get(paper_id)
+    if paper_info is None:
+        return f"There's no saved information related to paper {paper_id}."
+
+    try:
+        text = await paper_texts.text(paper_id, paper_info.get("pdf_url"))
+    except Exception as e:
+        logger.warning("Could not fetch the text of %s: %s", paper_id, e)
+        return f"Could not fetch the text of paper {paper_id}: {e}"
+    if not text:
+        return f"Paper {paper_id}'s PDF has no extractable text."
+
+    chunk = text_chunk(text, offset, max(1, min(max_chars, MAX_TEXT_CHARS)))
+    return json.dumps({"paper_id": paper_id, **chunk}, indent=2)
+
 
 if __name__ == "__main__":
+    # Bring the index up to date with existing papers_info.json files
+    store.import_json_dir(PAPER_DIR, export=JSON_EXPORT)
+    store.prune_search_cache(CACHE_TTL)
     # Initialize and run the server
-    mcp.run(transport='stdio')
\ No newline at end of file
+    try:
+        mcp.run(transport='stdio')
+    finally:
+        paper_texts.close()
\ No newline at end of file